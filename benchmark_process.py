@@ -1,22 +1,33 @@
-"""Ad-hoc benchmark comparing Process's stdout reading approach against two scenarios.
+"""Ad-hoc benchmark comparing Process's stdout reading approach against four scenarios.
 
-1. A chatty command that produces a lot of output while it's running.
+1. A chatty command that produces a lot of output while it's running, as well as one that
+   produces 1 GB of output while output is only read every 100ms (a renderer falling behind).
 2. A quick command that exits almost immediately, followed by a period of
    idle polling (simulating other still-running commands in the same group).
+3. Many commands running at the same time, comparing the previous approach of one reader
+   thread per command against reading every command's output from a single Reactor.
+
+NOTE: The 1000 command scenario needs a file descriptor limit of a few thousand (see `ulimit -n`)
 """
 
 from __future__ import annotations
 
 import resource
+import subprocess
 import sys
+import threading
 import time
+from io import BufferedReader
 
 sys.path.insert(0, "src")
 
 from pyallel.process import Process
+from pyallel.reactor import Reactor
 
 CHATTY_CMD = "python3 -c \"[print('line', i) for i in range(200000)]\""
+BULK_CMD = "yes 'a line of output from a very chatty command' | head -c 1073741824"
 QUICK_CMD = "echo hi"
+CONCURRENT_CMD = "i=0; while [ $i -lt 500 ]; do echo line $i; i=$((i+1)); done; sleep 0.5"
 
 
 def cpu_time() -> float:
@@ -24,17 +35,25 @@ def cpu_time() -> float:
     return usage.ru_utime + usage.ru_stime
 
 
+def wait_for(reactor: Reactor, seconds: float) -> None:
+    # Keep reading output while we wait, like the main loop does between renders
+    deadline = time.perf_counter() + seconds
+    while (remaining := deadline - time.perf_counter()) > 0:
+        reactor.wait(remaining)
+
+
 def run_scenario(name: str, command: str, poll_seconds: float, extra_idle_seconds: float) -> None:
+    reactor = Reactor()
     process = Process(1, command)
 
     start_wall = time.perf_counter()
     start_cpu = cpu_time()
 
-    process.run()
+    process.run(reactor)
 
     total_bytes = 0
     while process.poll() is None:
-        time.sleep(poll_seconds)
+        wait_for(reactor, poll_seconds)
         total_bytes += len(process.read())
 
     idle_deadline = time.perf_counter() + extra_idle_seconds
@@ -44,18 +63,98 @@ def run_scenario(name: str, command: str, poll_seconds: float, extra_idle_second
 
     end_wall = time.perf_counter()
     end_cpu = cpu_time()
+    reactor.close()
 
     print(f"{name:12} wall={end_wall - start_wall:6.3f}s  cpu={end_cpu - start_cpu:6.3f}s  bytes={total_bytes}")
 
 
+class ThreadedProcess(Process):
+    """The previous approach of reading each command's output with its own thread."""
+
+    def run(self, reactor: Reactor | None = None) -> None:  # noqa: ARG002
+        self.start = time.perf_counter()
+        self._process = subprocess.Popen(  # noqa: S602
+            self.command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=True,
+        )
+        self._lock = threading.Lock()
+        stdout = self._process.stdout
+        if not isinstance(stdout, BufferedReader):
+            raise TypeError(f"Expected stdout to be a BufferedReader, got {stdout.__class__}")
+
+        def _read_stdout() -> None:
+            while True:
+                data = stdout.read1(65536)
+                if not data:
+                    break
+                with self._lock:
+                    self._chunks.append(data)
+
+        threading.Thread(target=_read_stdout, daemon=True).start()
+
+    def poll(self) -> int | None:
+        return self._process.poll()
+
+    def read(self) -> bytes:
+        with self._lock:
+            chunks = self._chunks
+            self._chunks = []
+        return b"".join(chunks)
+
+
+def run_concurrent_scenario(name: str, num_commands: int, *, threaded: bool) -> None:
+    reactor = Reactor()
+    process_cls = ThreadedProcess if threaded else Process
+    processes = [process_cls(i, CONCURRENT_CMD) for i in range(num_commands)]
+
+    start_wall = time.perf_counter()
+    start_cpu = cpu_time()
+
+    for process in processes:
+        process.run(reactor)
+
+    max_threads = threading.active_count()
+    total_bytes = 0
+    while True:
+        max_threads = max(max_threads, threading.active_count())
+        polls = [process.poll() for process in processes]
+        total_bytes += sum(len(process.read()) for process in processes)
+        if all(poll is not None for poll in polls):
+            break
+        if threaded:
+            # The main loop used to sleep-poll on a fixed interval
+            time.sleep(0.008)
+        else:
+            reactor.wait()
+
+    end_wall = time.perf_counter()
+    end_cpu = cpu_time()
+    reactor.close()
+
+    print(
+        f"{name:12} commands={num_commands:<5} threads={max_threads:<5} "
+        f"wall={end_wall - start_wall:6.3f}s  cpu={end_cpu - start_cpu:6.3f}s  bytes={total_bytes}"
+    )
+
+
 def main() -> None:
     print("--- scenario: chatty command, output while it's still running ---")
     run_scenario("chatty", CHATTY_CMD, poll_seconds=0.1, extra_idle_seconds=0.0)
+    run_scenario("chatty-1gb", BULK_CMD, poll_seconds=0.1, extra_idle_seconds=0.0)
 
     print()
     print("--- scenario: quick command, then 2s of idle polling ---")
     run_scenario("quick+idle", QUICK_CMD, poll_seconds=0.1, extra_idle_seconds=2.0)
 
+    print()
+    print("--- scenario: many concurrent commands, reader thread per command vs single reactor ---")
+    for num_commands in (10, 100, 1000):
+        run_concurrent_scenario("threads", num_commands, threaded=True)
+        run_concurrent_scenario("reactor", num_commands, threaded=False)
+
 
 if __name__ == "__main__":
     main()
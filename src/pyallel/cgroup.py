@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import signal
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CGROUP_PATH = "/proc/self/cgroup"
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+
+def find_cgroup() -> Path | None:
+    """Return the cgroup v2 directory we are running in, if we are able to create cgroups within it."""
+    mount = None
+    cgroup = None
+    try:
+        with Path(MOUNTINFO_PATH).open() as f:
+            for line in f:
+                # The filesystem type comes straight after the separator, the mount point is always the 5th field
+                fields = line.split()
+                if fields[fields.index("-") + 1] == "cgroup2":
+                    mount = fields[4]
+                    break
+
+        with Path(CGROUP_PATH).open() as f:
+            for line in f:
+                if line.startswith("0::"):
+                    cgroup = line[3:].strip()
+                    break
+    except (OSError, ValueError, IndexError):
+        logger.debug("failed to find our cgroup", exc_info=True)
+        return None
+
+    if mount is None or cgroup is None:
+        return None
+
+    path = Path(mount) / cgroup.lstrip("/")
+    if not os.access(path, os.W_OK):
+        logger.debug("can't create cgroups within %s", path)
+        return None
+
+    return path
+
+
+class Cgroup:
+    """A cgroup v2 group containing a single command and every process it starts.
+
+    Unlike process groups, processes can't leave a cgroup on their own, so signalling
+    every process in it reaches everything the command has started.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._procs = str(path / "cgroup.procs")
+
+    @classmethod
+    def create(cls, parent: Path, name: str) -> Cgroup:
+        path = parent / name
+        path.mkdir(exist_ok=True)
+        return cls(path)
+
+    def join(self) -> None:
+        """Move the calling process into the cgroup, this is run in the child before the command is started."""
+        fd = os.open(self._procs, os.O_WRONLY)
+        try:
+            os.write(fd, b"0")
+        finally:
+            os.close(fd)
+
+    def signal(self, signum: int) -> None:
+        # Killing everything in one go avoids racing with processes that are starting new ones
+        if signum == signal.SIGKILL:
+            with contextlib.suppress(OSError):
+                (self.path / "cgroup.kill").write_text("1")
+                return
+
+        try:
+            pids = Path(self._procs).read_text().split()
+        except OSError:
+            return
+
+        for pid in pids:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(int(pid), signum)
+
+    def remove(self) -> None:
+        # This only succeeds once every process in the cgroup has exited
+        try:
+            self.path.rmdir()
+        except OSError:
+            logger.debug("failed to remove cgroup %s", self.path, exc_info=True)
@@ -1,6 +1,10 @@
+from __future__ import annotations
+
 import re
 import shutil
+import signal
 import sys
+from typing import Any, Callable
 
 IN_TTY = sys.stdout.isatty()
 
@@ -8,6 +12,7 @@ IN_TTY = sys.stdout.isatty()
 CLEAR_LINE = "\033[2K"
 UP_LINE = "\033[1A\r"
 DOWN_LINE = "\033[1B\r"
+CLEAR_SCREEN = "\033[H\033[2J"
 HIDE_CURSOR = "\033[?25l"
 SHOW_CURSOR = "\033[?25h"
 # Terminal synchronized update mode: https://gist.github.com/christianparpart/d8a62cc1ab659194337d73e399004036
@@ -16,13 +21,47 @@ SYNC_UPDATE_BEGIN = "\033[?2026h"
 SYNC_UPDATE_END = "\033[?2026l"
 ANSI_ESCAPE = re.compile(r"(\x9B|\x1B\[|\x1B\()[0-?]*[ -\/]*[@-~]")
 
-if IN_TTY:
 
-    def columns() -> int:
-        return shutil.get_terminal_size().columns
+class TerminalSize:
+    """Cache the size of the terminal, only refreshing it when the terminal is resized.
 
-    def lines() -> int:
-        return shutil.get_terminal_size().lines
+    Callbacks registered with `on_resize` are called whenever the size changes.
+    """
+
+    def __init__(self) -> None:
+        self._size = shutil.get_terminal_size()
+        self._callbacks: list[Callable[[], None]] = []
+
+    def columns(self) -> int:
+        return self._size.columns
+
+    def lines(self) -> int:
+        return self._size.lines
+
+    def on_resize(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+
+    def watch(self) -> None:
+        signal.signal(signal.SIGWINCH, self.handle_signal)
+
+    def handle_signal(self, _signum: int, _frame: Any) -> None:
+        self.refresh()
+
+    def refresh(self) -> None:
+        size = shutil.get_terminal_size()
+        if size == self._size:
+            return
+
+        self._size = size
+        for callback in self._callbacks:
+            callback()
+
+
+TERMINAL_SIZE = TerminalSize()
+
+if IN_TTY:
+    columns = TERMINAL_SIZE.columns
+    lines = TERMINAL_SIZE.lines
 
 else:
 
@@ -38,6 +77,19 @@ ICONS = ("/", "-", "\\", "|")
 # The maximum time to wait between renders in seconds
 MAX_WAIT_BETWEEN_RENDERS = 0.1
 
+# The maximum number of times output is rendered per second by default
+DEFAULT_FPS = 30
+
+# How long to give commands that have timed out or been cancelled to exit after each signal we send them,
+# before sending a more forceful one, in seconds
+DEFAULT_GRACE_PERIOD = 5.0
+
+# How long to wait before retrying a failed command in seconds, this doubles after every attempt
+RETRY_BACKOFF = 1.0
+
+# How often to re-check system load in seconds while commands are waiting for it to drop
+LOAD_CHECK_INTERVAL = 0.5
+
 # Unicode character bytes to render different symbols in the terminal
 TICK = "\u2714"
 X = "\u2718"
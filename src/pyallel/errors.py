@@ -6,5 +6,25 @@ class InvalidLinesModifierError(PyallelError):
     """Raised when the lines modifier is invalid."""
 
 
+class InvalidJobsModifierError(PyallelError):
+    """Raised when the jobs modifier is invalid."""
+
+
+class InvalidTimeoutModifierError(PyallelError):
+    """Raised when the timeout modifier is invalid."""
+
+
+class InvalidRetriesModifierError(PyallelError):
+    """Raised when the retries modifier is invalid."""
+
+
+class InvalidFailFastModifierError(PyallelError):
+    """Raised when the fail_fast modifier is invalid."""
+
+
+class InvalidDependencyModifierError(PyallelError):
+    """Raised when the name or after modifiers are invalid."""
+
+
 class NoCommandsForProcessGroupError(PyallelError):
     """Raised when no commands have been provided for a process group."""
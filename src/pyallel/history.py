@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of commands to remember, the least recently run are forgotten first
+MAX_ENTRIES = 1000
+# How much a new duration moves the expected duration towards it, so one slow run doesn't throw it off completely
+SMOOTHING = 0.5
+
+
+def default_path() -> Path:
+    cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache) / "pyallel" / "history.json"
+
+
+class DurationHistory:
+    """How long commands have taken to run before, keyed by the command and the directory it was run from.
+
+    The history is stored as a JSON list of `[cwd, command, seconds]` entries, ordered from least to most recently run.
+    """
+
+    def __init__(self, path: Path, cwd: str, durations: dict[tuple[str, str], float] | None = None) -> None:
+        self.path = path
+        self.cwd = cwd
+        self._durations = durations or {}
+        self._recorded: dict[tuple[str, str], float] = {}
+
+    @classmethod
+    def load(cls, path: Path | None = None, cwd: str | None = None) -> DurationHistory:
+        path = path or default_path()
+        return cls(path, cwd or str(Path.cwd()), _read(path))
+
+    def expected(self, command: str) -> float:
+        """Return how long `command` is expected to take, or 0 if it hasn't been run from this directory before."""
+        return self._durations.get((self.cwd, command), 0.0)
+
+    def record(self, command: str, duration: float) -> None:
+        key = (self.cwd, command)
+        previous = self._durations.pop(key, None)
+        if previous is not None:
+            duration = previous + SMOOTHING * (duration - previous)
+        self._durations[key] = duration
+        self._recorded[key] = duration
+
+    def save(self) -> None:
+        # Other runs could have updated the history since we loaded it, so only apply what we've recorded on top
+        durations = _read(self.path)
+        for key, duration in self._recorded.items():
+            durations.pop(key, None)
+            durations[key] = duration
+
+        entries = [[cwd, command, duration] for (cwd, command), duration in durations.items()]
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(entries[-MAX_ENTRIES:]))
+            tmp_path.replace(self.path)
+        except OSError:
+            logger.warning("failed to save duration history to %s", self.path, exc_info=True)
+
+
+def _read(path: Path) -> dict[tuple[str, str], float]:
+    try:
+        entries = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("ignoring unreadable duration history in %s", path, exc_info=True)
+        return {}
+
+    durations: dict[tuple[str, str], float] = {}
+    if not isinstance(entries, list):
+        return durations
+
+    for entry in entries:
+        # Skip over anything that doesn't look like one of our entries rather than failing to load everything
+        if isinstance(entry, list) and len(entry) == 3 and isinstance(entry[2], (int, float)):  # noqa: PLR2004
+            cwd, command, duration = entry
+            durations[str(cwd), str(command)] = float(duration)
+
+    return durations
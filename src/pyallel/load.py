@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pyallel import constants
+
+logger = logging.getLogger(__name__)
+
+LOADAVG_PATH = "/proc/loadavg"
+MEMINFO_PATH = "/proc/meminfo"
+PRESSURE_PATHS = {
+    "cpu": "/proc/pressure/cpu",
+    "memory": "/proc/pressure/memory",
+    "io": "/proc/pressure/io",
+}
+
+
+@dataclass
+class LoadLimits:
+    """Thresholds on how busy the system is, new commands aren't started while any of them are exceeded.
+
+    A threshold of 0 is disabled, and any that can't be read on this system are ignored.
+    """
+
+    # The 1 minute load average
+    max_load: float = 0.0
+    # Available memory in MiB
+    min_memory: int = 0
+    # The percentage of time in the last 10 seconds that some tasks were stalled on cpu, memory or io
+    max_pressure: float = 0.0
+    _last_check: float = field(default=0.0, init=False, repr=False)
+    _reason: str = field(default="", init=False, repr=False)
+
+    def __bool__(self) -> bool:
+        return bool(self.max_load or self.min_memory or self.max_pressure)
+
+    def check(self) -> str:
+        """Return why new commands should wait before being started, or an empty string if they can start now."""
+        # None of these values change quickly, so there's no point reading them on every poll
+        now = time.perf_counter()
+        if self._last_check and now - self._last_check < constants.LOAD_CHECK_INTERVAL:
+            return self._reason
+
+        self._last_check = now
+        self._reason = self._check()
+        if self._reason:
+            logger.debug("holding back new commands: %s", self._reason)
+        return self._reason
+
+    def _check(self) -> str:
+        if self.max_load:
+            load = read_load()
+            if load is not None and load > self.max_load:
+                return f"load {load:.2f} > {self.max_load:g}"
+
+        if self.min_memory:
+            memory = read_available_memory()
+            if memory is not None and memory < self.min_memory:
+                return f"memory {memory}MiB < {self.min_memory}MiB"
+
+        if self.max_pressure:
+            for resource, path in PRESSURE_PATHS.items():
+                pressure = read_pressure(path)
+                if pressure is not None and pressure > self.max_pressure:
+                    return f"{resource} pressure {pressure:.1f}% > {self.max_pressure:g}%"
+
+        return ""
+
+
+def read_load() -> float | None:
+    try:
+        return float(Path(LOADAVG_PATH).read_text().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_available_memory() -> int | None:
+    try:
+        with Path(MEMINFO_PATH).open() as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def read_pressure(path: str) -> float | None:
+    try:
+        with Path(path).open() as f:
+            for line in f:
+                kind, *fields = line.split()
+                if kind != "some":
+                    continue
+                for value in fields:
+                    name, _, number = value.partition("=")
+                    if name == "avg10":
+                        return float(number)
+    except (OSError, ValueError):
+        return None
+    return None
@@ -7,8 +7,11 @@ import time
 import traceback
 
 from pyallel import constants
+from pyallel.cgroup import find_cgroup
 from pyallel.colours import Colours
 from pyallel.errors import PyallelError
+from pyallel.history import DurationHistory
+from pyallel.load import LoadLimits
 from pyallel.logging import configure_logging
 from pyallel.parser import Arguments, create_parser
 from pyallel.printer import (
@@ -43,23 +46,67 @@ def entry_point(*args: str) -> int:
     if not parsed_args.interactive or not constants.IN_TTY:
         printer = NonInteractiveConsolePrinter(colours, timer=parsed_args.timer)
     else:
-        printer = InteractiveConsolePrinter(colours, timer=parsed_args.timer)
+        printer = InteractiveConsolePrinter(colours, timer=parsed_args.timer, scrollback=parsed_args.scrollback)
+
+    cgroup_parent = None
+    if parsed_args.cgroup:
+        cgroup_parent = find_cgroup()
+        if cgroup_parent is None:
+            logger.debug("cgroup v2 isn't available, falling back to process groups")
 
     try:
-        process_group_manager = ProcessGroupManager.from_args(*parsed_args.commands)
+        process_group_manager = ProcessGroupManager.from_args(
+            *parsed_args.commands,
+            encoding=parsed_args.encoding,
+            errors=parsed_args.encoding_errors,
+            jobs=parsed_args.jobs,
+            load_limits=LoadLimits(
+                max_load=parsed_args.max_load,
+                min_memory=parsed_args.min_memory,
+                max_pressure=parsed_args.max_pressure,
+            ),
+            fail_fast=parsed_args.fail_fast,
+            timeout=parsed_args.timeout,
+            grace_period=parsed_args.grace_period,
+            cgroup_parent=cgroup_parent,
+        )
     except PyallelError as e:
         print(f"{colours.red_bold}Error{colours.reset_colour}: {e!s}")
         return 1
 
+    history = None
+    if parsed_args.history:
+        history = DurationHistory.load()
+        for group in process_group_manager.groups:
+            for process in group.processes:
+                process.expected = history.expected(process.command)
+
+    if isinstance(printer, InteractiveConsolePrinter):
+        # Make sure we re-render everything as soon as the terminal is resized
+        constants.TERMINAL_SIZE.on_resize(printer.handle_resize)
+        constants.TERMINAL_SIZE.on_resize(process_group_manager.reactor.wake)
+        constants.TERMINAL_SIZE.watch()
+
     logger.debug("starting run with arguments:\n%s", parsed_args)
     try:
-        exit_code = run(process_group_manager, printer)
+        exit_code = run(process_group_manager, printer, fps=parsed_args.fps)
     except Exception:
         logger.exception("failed run with arguments:\n%s", parsed_args)
         print(
             f"{colours.red_bold}Error{colours.reset_colour}: encountered unexpected error\n\n{traceback.format_exc()}"
         )
         return 1
+    finally:
+        process_group_manager.close()
+
+    if history is not None:
+        # Only successful runs are recorded, as failures can finish early and
+        # throw off how long we expect a command to take
+        for group in process_group_manager.groups:
+            for process in group.processes:
+                if process.end and process.return_code() == 0:
+                    history.record(process.command, process.end - process.start)
+        history.save()
 
     if exit_code == 1:
         logger.error("failed run with arguments:\n%s", parsed_args)
@@ -75,11 +122,21 @@ def entry_point(*args: str) -> int:
     return exit_code
 
 
-def run(process_group_manager: ProcessGroupManager, printer: Printer) -> int:
+def run(process_group_manager: ProcessGroupManager, printer: Printer, *, fps: int = constants.DEFAULT_FPS) -> int:
+    # Output is read as soon as it is available, but we only render it at most once a frame,
+    # so a slow terminal can't hold up reading the output of the commands
+    frame_interval = 1 / fps if fps else 0.0
+    next_frame = 0.0
+    pending_render = True
+
     process_group_manager.run()
     while True:
-        output = process_group_manager.stream()
-        printer.print(output)
+        now = time.perf_counter()
+        if pending_render and now >= next_frame:
+            output = process_group_manager.stream()
+            printer.print(output)
+            next_frame = now + frame_interval
+            pending_render = False
 
         poll = process_group_manager.poll()
         if poll is not None:
@@ -95,7 +152,14 @@ def run(process_group_manager: ProcessGroupManager, printer: Printer) -> int:
             if not process_group_manager.next():
                 return 0
 
-        time.sleep(0.008)
+            pending_render = True
+            continue
+
+        # Sleep until a command produces output, exits, we receive a signal or the printer needs to re-render.
+        # If something has already happened since the last render we only need to wait until the next frame
+        timeout = max(next_frame - now, 0.0) if pending_render else printer.render_interval
+        process_group_manager.wait(timeout)
+        pending_render = True
 
 
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from argparse import ArgumentParser, RawTextHelpFormatter
+import codecs
+import os
+from argparse import ArgumentParser, ArgumentTypeError, RawTextHelpFormatter
 from typing import Literal
 
+from pyallel import constants
+
 
 class Arguments:
     colour: Literal["yes", "no", "auto"]
@@ -12,6 +16,19 @@ class Arguments:
     version: bool
     debug: bool
     summary: bool
+    history: bool
+    cgroup: bool
+    fail_fast: bool
+    timeout: float
+    grace_period: float
+    scrollback: int
+    jobs: int
+    max_load: float
+    min_memory: int
+    max_pressure: float
+    fps: int
+    encoding: str
+    encoding_errors: str
 
     def __repr__(self) -> str:
         msg = ""
@@ -54,6 +71,51 @@ lines (only used in interactive mode):
 
   90 is expressed as a percentage value, which must be between 1 and 100 inclusive
 
+jobs:
+  the jobs modifier allows you to limit how many commands within a command group can run at the same time,
+  the rest are queued and started as soon as a running command completes
+
+    %(prog)s jobs=2 :::: echo first :: echo second :: echo third
+
+  the jobs modifier applies to the whole command group and overrides the --jobs option for that group
+
+timeout:
+  the timeout modifier allows you to stop a command if it is still running after the given number of seconds,
+  it is interrupted first, then terminated and then killed, waiting for --grace-period between each one
+
+    %(prog)s timeout=60 :::: pytest . :: mypy .
+
+  the timeout modifier only applies to the command it is set on and overrides the --timeout option for it
+
+retries:
+  the retries modifier allows you to run a command again if it fails, up to the given number of times.
+  the first retry waits for 1 second and each one after that waits twice as long as the one before
+
+    %(prog)s retries=2 :::: pytest tests/integration :: mypy .
+
+  the retries modifier only applies to the command it is set on
+
+fail_fast:
+  the fail_fast modifier allows you to cancel the rest of the commands in a command group as soon as
+  one of them fails, they are interrupted first and then killed if they are still running after --grace-period
+
+    %(prog)s fail_fast=yes :::: ruff . :: pytest .
+
+  the fail_fast modifier must be either yes or no, it applies to the whole command group
+  and overrides the --fail-fast option for that group
+
+name and after:
+  the name modifier gives a command a name that other commands in the same command group can depend on
+  using the after modifier, which takes a comma separated list of names. a command with the after modifier
+  is only run once all of the commands it depends on have completed successfully, and isn't run at all
+  if any of them fail
+
+    %(prog)s name=build :::: make :: after=build :::: make test :: name=lint :::: ruff . :: after=lint :::: mypy .
+
+  the above runs 'make test' as soon as 'make' succeeds, independently of 'ruff .' and 'mypy .'.
+  command groups (:::) still run one after another, as if every command in a group depended on
+  every command in the group before it
+
 SHELL SYNTAX
 ============
 each command is executed inside its own shell, this means shell syntax is supported.
@@ -72,6 +134,49 @@ some examples of using shell syntax are below (single quotes are used only if re
 """
 
 
+def non_negative_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid int value: {value!r}")
+
+    if number < 0:
+        raise ArgumentTypeError(f"must not be negative: {value!r}")
+
+    return number
+
+
+def non_negative_float(value: str) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid float value: {value!r}")
+
+    if number < 0:
+        raise ArgumentTypeError(f"must not be negative: {value!r}")
+
+    return number
+
+
+def jobs(value: str) -> int:
+    if value == "auto":
+        return os.cpu_count() or 1
+
+    try:
+        return non_negative_int(value)
+    except ArgumentTypeError:
+        raise ArgumentTypeError(f"invalid jobs value: {value!r}, must be a non-negative int or 'auto'")
+
+
+def encoding(value: str) -> str:
+    try:
+        codecs.lookup(value)
+    except LookupError:
+        raise ArgumentTypeError(f"unknown encoding: {value!r}")
+
+    return value
+
+
 def create_parser() -> ArgumentParser:
     parser = ArgumentParser(
         prog="pyallel",
@@ -99,6 +204,43 @@ def create_parser() -> ArgumentParser:
         action="store_false",
         default=True,
     )
+    parser.add_argument(
+        "-f",
+        "--fail-fast",
+        help="cancel the rest of the commands in a command group as soon as one of them fails",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--timeout",
+        help="stop commands that are still running after SECONDS, 0 disables this, defaults to %(default)s",
+        metavar="SECONDS",
+        type=non_negative_float,
+        default=0.0,
+    )
+    parser.add_argument(
+        "--grace-period",
+        help="how long to give commands that have timed out or been cancelled to exit after being interrupted,\n"
+        "before they are terminated and then killed, defaults to %(default)s",
+        metavar="SECONDS",
+        type=non_negative_float,
+        default=constants.DEFAULT_GRACE_PERIOD,
+    )
+    parser.add_argument(
+        "--no-history",
+        help="don't use or update the history of how long commands took to run, which is used to start\n"
+        "the longest running commands first and to show how long commands were expected to take in the summary",
+        dest="history",
+        action="store_false",
+        default=True,
+    )
+    parser.add_argument(
+        "--cgroup",
+        help="run each command in its own cgroup when cgroup v2 is available and writable, so every process\n"
+        "a command starts is stopped along with it, even ones that leave its process group",
+        action="store_true",
+        default=False,
+    )
     parser.add_argument(
         "-n",
         "--non-interactive",
@@ -120,6 +262,66 @@ def create_parser() -> ArgumentParser:
         choices=("yes", "no", "auto"),
         default="auto",
     )
+    parser.add_argument(
+        "--scrollback",
+        help="only keep the last LINES lines of output for each command in interactive mode,\n"
+        "0 keeps all output, defaults to %(default)s",
+        metavar="LINES",
+        type=non_negative_int,
+        default=0,
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="the maximum number of commands within a command group to run at the same time,\n"
+        '"auto" uses the number of CPUs, 0 runs every command at once, defaults to %(default)s',
+        metavar="N",
+        type=jobs,
+        default=0,
+    )
+    parser.add_argument(
+        "--max-load",
+        help="don't start new commands while the 1 minute load average is above LOAD, 0 disables this,\n"
+        "defaults to %(default)s",
+        metavar="LOAD",
+        type=non_negative_float,
+        default=0.0,
+    )
+    parser.add_argument(
+        "--min-memory",
+        help="don't start new commands while less than MIB mebibytes of memory is available, 0 disables this,\n"
+        "defaults to %(default)s",
+        metavar="MIB",
+        type=non_negative_int,
+        default=0,
+    )
+    parser.add_argument(
+        "--max-pressure",
+        help="don't start new commands while the cpu, memory or io pressure (the percentage of the last\n"
+        "10 seconds tasks spent stalled waiting on them) is above PCT, 0 disables this, defaults to %(default)s",
+        metavar="PCT",
+        type=non_negative_float,
+        default=0.0,
+    )
+    parser.add_argument(
+        "--fps",
+        help="the maximum number of times output is rendered per second, 0 renders output as soon as it\n"
+        "arrives, defaults to %(default)s",
+        type=non_negative_int,
+        default=constants.DEFAULT_FPS,
+    )
+    parser.add_argument(
+        "--encoding",
+        help='encoding used to decode the output of commands, defaults to "%(default)s"',
+        type=encoding,
+        default="utf-8",
+    )
+    parser.add_argument(
+        "--encoding-errors",
+        help='how to handle output that can\'t be decoded, defaults to "%(default)s"',
+        choices=("strict", "replace", "ignore", "backslashreplace"),
+        default="replace",
+    )
     parser.add_argument(
         "--debug",
         help='enable debug mode, which logs debug info to a "pyallel.log" file in the current directory',
@@ -19,6 +19,9 @@ logger = logging.getLogger(__name__)
 
 
 class Printer(Protocol):
+    # The maximum time the main loop can wait before calling print again, None to only print on new events
+    render_interval: float | None
+
     def print(self, output: ProcessGroupOutput, *, done: bool = False) -> None: ...
 
 
@@ -30,20 +33,36 @@ class ConsolePrinter:
 
 
 class InteractiveConsolePrinter(ConsolePrinter):
-    def __init__(self, colours: Colours | None = None, *, timer: bool = False) -> None:
+    # Re-render periodically so the progress spinner and timers keep ticking over
+    render_interval: float | None = constants.MAX_WAIT_BETWEEN_RENDERS
+
+    def __init__(self, colours: Colours | None = None, *, timer: bool = False, scrollback: int = 0) -> None:
         super().__init__(colours, include_timer=timer)
+        self._scrollback = scrollback
         self._cur_output: ProcessGroupOutput | None = None
         self._last_printed: list[tuple[bool, str, str]] = []
         self._buffer: list[str] = []
         self._last_progress_spinner_render = 0.0
         self._icon = 0
+        self._layout_key: tuple[int, tuple[tuple[float, int], ...]] | None = None
+        self._layout: tuple[int, ...] = ()
+        self._resized = False
 
     def print(self, output: ProcessGroupOutput, *, done: bool = False) -> None:
         if self._cur_output is None or self._cur_output.id != output.id:
             self._cur_output = output
+            for process_output in output.processes:
+                process_output.set_scrollback(self._scrollback)
         else:
             self._cur_output.merge(output)
 
+        if self._resized:
+            # Lines we've already printed may have been re-wrapped by the terminal, so we can't
+            # reliably update them in place anymore, instead clear the screen and print everything again
+            self._resized = False
+            self._output(constants.CLEAR_SCREEN)
+            self.reset()
+
         self.print_process_group_output(self._cur_output, interrupt_count=output.interrupt_count)
 
         if done:
@@ -161,11 +180,19 @@ class InteractiveConsolePrinter(ConsolePrinter):
 
         out.append((False, self.generate_process_output_status(output), "\n"))
 
-        lines = output.data.splitlines()
-
         if tail_output:
-            output_lines = output.allocated_lines - 1
-            lines = [] if output_lines == 0 else lines[-output_lines:]
+            # Only the lines that fit on screen are needed, so avoid splitting up the whole output every frame
+            lines = output.tail(output.allocated_lines - 1)
+        else:
+            lines = output.splitlines()
+            if output.dropped_lines:
+                out.append(
+                    (
+                        True,
+                        f"{self._colours.dim_on}... {output.dropped_lines} earlier lines not kept (see --scrollback){self._colours.dim_off}",
+                        "\n",
+                    )
+                )
 
         for line in lines:
             end = line[-1] if line else ""
@@ -176,7 +203,7 @@ class InteractiveConsolePrinter(ConsolePrinter):
 
         return out
 
-    def generate_process_output_status(self, output: ProcessOutput, *, columns: int | None = None) -> str:
+    def generate_process_output_status(self, output: ProcessOutput, *, columns: int | None = None) -> str:  # noqa: PLR0915
         columns = columns or constants.columns()
         passed = None
         icon = ""
@@ -192,7 +219,15 @@ class InteractiveConsolePrinter(ConsolePrinter):
             self._last_progress_spinner_render = elapsed
         icon = constants.ICONS[self._icon]
 
-        if passed is True:
+        if passed is not None and output.cancelled:
+            colour = self._colours.dim_on
+            msg = "cancelled"
+            icon = constants.X
+        elif passed is not None and output.timed_out:
+            colour = self._colours.red_bold
+            msg = "timed out"
+            icon = constants.X
+        elif passed is True:
             colour = self._colours.green_bold
             msg = "done"
             icon = constants.TICK
@@ -200,6 +235,10 @@ class InteractiveConsolePrinter(ConsolePrinter):
             colour = self._colours.red_bold
             msg = "failed"
             icon = constants.X
+        elif output.waiting:
+            colour = self._colours.dim_on
+            msg = f"queued ({output.queued_reason})" if output.queued_reason else "queued"
+            icon = ""
         else:
             colour = self._colours.white_bold
             msg = "running"
@@ -207,22 +246,27 @@ class InteractiveConsolePrinter(ConsolePrinter):
                 msg += "..."
 
         timer = ""
-        if self._include_timer:
+        if self._include_timer and not output.waiting:
             timer = f"({format_time_taken(elapsed)})"
 
+        attempt = format_attempt(output)
+
         command = output.command
         status = f"{self._colours.white_bold}[{self._colours.reset_colour}{self._colours.blue_bold}{command}{self._colours.reset_colour}{self._colours.white_bold}]{self._colours.reset_colour}{colour} {msg} {icon}{self._colours.reset_colour}"
         if get_num_lines(status, columns) > 1:
-            columns = columns - (len(msg) + len(timer) + 9)
+            columns = columns - (len(msg) + len(timer) + len(attempt) + 9)
             command = truncate_line(command, columns)
             status = f"{self._colours.white_bold}[{self._colours.reset_colour}{self._colours.blue_bold}{command}{self._colours.reset_colour}{self._colours.white_bold}]{self._colours.reset_colour}{colour} {msg} {icon}{self._colours.reset_colour}"
 
+        if attempt:
+            status += f" {self._colours.dim_on}{attempt}{self._colours.dim_off}"
+
         if timer:
             status += f" {self._colours.dim_on}{timer}{self._colours.dim_off}"
 
         return status
 
-    def set_process_lines(  # noqa: PLR0915
+    def set_process_lines(
         self,
         output: ProcessGroupOutput,
         interrupt_count: int = 0,
@@ -232,6 +276,23 @@ class InteractiveConsolePrinter(ConsolePrinter):
         if interrupt_count:
             lines -= 2
 
+        # The layout only changes when the screen size changes or a process that doesn't fill the screen gets more
+        # lines of output, as the allocation never gives a process more lines than the whole screen, so the line
+        # counts are clamped to the number of lines available
+        layout_key = (
+            lines,
+            tuple((p.allocated_percentage_lines, min(p.lines, lines)) for p in output.processes),
+        )
+        if layout_key == self._layout_key:
+            for process_output, allocated_lines in zip(output.processes, self._layout):
+                process_output.allocated_lines = allocated_lines
+            return
+
+        self._allocate_process_lines(output, lines)
+        self._layout_key = layout_key
+        self._layout = tuple(p.allocated_lines for p in output.processes)
+
+    def _allocate_process_lines(self, output: ProcessGroupOutput, lines: int) -> None:  # noqa: PLR0915
         logger.debug("initial available lines in screen = %d", lines)
         # Allocate lines to processes that have a fixed percentage of lines set
         allocated_process_lines = lines // len(output.processes)
@@ -331,6 +392,9 @@ class InteractiveConsolePrinter(ConsolePrinter):
 
         logger.debug("all screen lines have been allocated")
 
+    def handle_resize(self) -> None:
+        self._resized = True
+
     def clear_last_printed_lines(self) -> None:
         # Clear all the lines that were just printed
         self._output(f"{constants.CLEAR_LINE}{constants.UP_LINE}{constants.CLEAR_LINE}" * len(self._last_printed))
@@ -385,37 +449,53 @@ class InteractiveConsolePrinter(ConsolePrinter):
 
 
 class NonInteractiveConsolePrinter(ConsolePrinter):
+    render_interval: float | None = None
+
     def __init__(self, colours: Colours | None = None, *, timer: bool = False) -> None:
         super().__init__(colours, include_timer=timer)
         self._cur_pg_output: ProcessGroupOutput | None = None
         self._p_new = True
         self._p_index = 0
+        self._p_attempts = 0
         self._generated_lines: list[tuple[bool, str, str]] = []
 
     def print(self, output: ProcessGroupOutput, *, done: bool = False) -> None:  # noqa: ARG002
         if self._cur_pg_output is None or self._cur_pg_output.id != output.id:
             self._p_new = True
             self._p_index = 0
+            self._p_attempts = 0
             self._cur_pg_output = output
         else:
             self._cur_pg_output.merge(output)
 
-        try:
-            p_output = output.processes[self._p_index]
-        except IndexError:
-            return
+        # Keep moving on to the next process while the current one has completed, as we only get
+        # called again once something new happens, which could be a while for quiet commands
+        while True:
+            try:
+                p_output = output.processes[self._p_index]
+            except IndexError:
+                return
 
-        if self._p_new:
-            self._p_new = False
-            p_output = self._cur_pg_output.processes[self._p_index]
-            header = self.generate_process_header(p_output.command)
-            self._write(header)
+            if self._p_new:
+                self._p_new = False
+                p_output = self._cur_pg_output.processes[self._p_index]
+                header = self.generate_process_header(p_output.command)
+                self._write(header)
 
-        self.print_process_output(p_output)
+            self.print_process_output(p_output)
+
+            # Let the user know why output from the start of the command could be printed again
+            attempts = self._cur_pg_output.processes[self._p_index].attempts
+            if len(attempts) > self._p_attempts:
+                self._p_attempts = len(attempts)
+                self._write(self.generate_process_retry(self._cur_pg_output.processes[self._p_index]))
+
+            if p_output.poll is None:
+                return
 
-        if p_output.poll is not None:
             self._p_new = True
             self._p_index += 1
+            self._p_attempts = 0
             header = self.generate_process_footer(p_output)
             self._write(header)
 
@@ -445,7 +525,15 @@ class NonInteractiveConsolePrinter(ConsolePrinter):
         if output.poll is not None:
             passed = output.poll == 0
 
-        if passed:
+        if output.cancelled:
+            colour = self._colours.dim_on
+            msg = "cancelled"
+            icon = constants.X
+        elif output.timed_out:
+            colour = self._colours.red_bold
+            msg = "timed out"
+            icon = constants.X
+        elif passed:
             colour = self._colours.green_bold
             msg = "done"
             icon = constants.TICK
@@ -471,6 +559,10 @@ class NonInteractiveConsolePrinter(ConsolePrinter):
             f"{colour} {msg} {icon}{self._colours.reset_colour}"
         )
 
+        attempt = format_attempt(output)
+        if attempt:
+            status += f" {self._colours.dim_on}{attempt}{self._colours.dim_off}"
+
         if timer:
             status += f" {self._colours.dim_on}{timer}{self._colours.dim_off}"
 
@@ -479,6 +571,25 @@ class NonInteractiveConsolePrinter(ConsolePrinter):
 
         return status
 
+    def generate_process_retry(self, output: ProcessOutput) -> str:
+        duration, exit_code = output.attempts[-1]
+        status = (
+            f"{self._colours.white_bold}"
+            f"[{self._colours.reset_colour}"
+            f"{self._colours.blue_bold}{output.command}{self._colours.reset_colour}"
+            f"{self._colours.white_bold}]{self._colours.reset_colour}"
+            f"{self._colours.yellow_bold} failed with exit code {exit_code}, retrying...{self._colours.reset_colour}"
+            f" {self._colours.dim_on}(attempt {len(output.attempts)}/{output.retries + 1}){self._colours.dim_off}"
+        )
+
+        if self._include_timer:
+            status += f" {self._colours.dim_on}({format_time_taken(duration)}){self._colours.dim_off}"
+
+        out = (False, status, "\n")
+        self._generated_lines.append(out)
+
+        return status
+
     def generate_process_output(self, output: ProcessOutput) -> list[tuple[bool, str, str]]:
         out: list[tuple[bool, str, str]] = []
         lines = output.data.splitlines(keepends=True)
@@ -514,13 +625,21 @@ class ProcessSummaryLine:
     duration: str
     group: str
     command: str
+    wait: str = ""
+    expected: str = ""
+    cancelled: bool = False
+    timed_out: bool = False
+    attempts: str = ""
 
     def to_line(self, colours: Colours | None = None) -> str:
         line = (
             self.generate_status(colours),
             self.generate_duration(colours),
+            self.generate_expected(colours),
+            self.generate_wait(colours),
             self.generate_group(colours),
             self.generate_command(colours),
+            self.generate_attempts(colours),
         )
         return " ".join(filter(len, line))
 
@@ -528,9 +647,9 @@ class ProcessSummaryLine:
         if not colours:
             return self.status
 
-        if self.poll == -1:
+        if self.poll == -1 or self.cancelled:
             return f"{colours.dim_on}{self.status}{colours.dim_off}"
-        if self.poll == 0:
+        if self.poll == 0 and not self.timed_out:
             return f"{colours.green_bold}{self.status}{colours.reset_colour}"
         return f"{colours.red_bold}{self.status}{colours.reset_colour}"
 
@@ -542,12 +661,30 @@ class ProcessSummaryLine:
 
         return f"{colours.white_bold}{self.duration}{colours.reset_colour}"
 
+    def generate_expected(self, colours: Colours | None = None) -> str:
+        if not self.expected.strip() or not colours:
+            return self.expected
+
+        return f"{colours.dim_on}{self.expected}{colours.dim_off}"
+
+    def generate_wait(self, colours: Colours | None = None) -> str:
+        if not self.wait.strip() or not colours:
+            return self.wait
+
+        return f"{colours.dim_on}{self.wait}{colours.dim_off}"
+
     def generate_group(self, colours: Colours | None = None) -> str:
         if not self.group.strip() or not colours:
             return self.group
 
         return f"{colours.dim_on}{self.group}{colours.dim_off}"
 
+    def generate_attempts(self, colours: Colours | None = None) -> str:
+        if not self.attempts or not colours:
+            return self.attempts
+
+        return f"{colours.dim_on}{self.attempts}{colours.dim_off}"
+
     def generate_command(self, colours: Colours | None = None) -> str:
         if not colours:
             return f"[{self.command}]"
@@ -559,7 +696,7 @@ class ProcessSummaryLine:
         )
 
 
-def generate_summary(
+def generate_summary(  # noqa: PLR0915
     process_group_outputs: list[ProcessGroupOutput],
     colours: Colours | None = None,
     columns: int | None = None,
@@ -576,7 +713,11 @@ def generate_summary(
             poll = p.poll
             if poll is None:
                 continue
-            if poll == -1:
+            if p.cancelled:
+                status = f"cancelled {constants.X}"
+            elif p.timed_out:
+                status = f"timed out {constants.X}"
+            elif poll == -1:
                 status = "not started"
             elif poll != 0:
                 status = f"failed {constants.X}"
@@ -584,8 +725,22 @@ def generate_summary(
                 status = f"done {constants.TICK}"
 
             duration = ""
+            expected = ""
+            wait = ""
             if include_timer and poll != -1:
                 duration = format_time_taken(p.end - p.start)
+                if p.expected:
+                    expected = f"(expected {format_time_taken(p.expected)})"
+                # Time spent waiting for a free job slot is reported separately from the time spent running
+                if p.queued and round(p.start - p.queued, 1):
+                    wait = f"(queued {format_time_taken(p.start - p.queued)})"
+
+            attempts = ""
+            if p.attempts:
+                attempts = ", ".join(
+                    f"{format_time_taken(d)} exit {c}" if include_timer else f"exit {c}" for d, c in p.attempts
+                )
+                attempts = f"(failed attempts: {attempts})"
 
             group = ""
             if num_groups > 1:
@@ -598,6 +753,11 @@ def generate_summary(
                     duration=duration,
                     group=group,
                     command=p.command,
+                    wait=wait,
+                    expected=expected,
+                    cancelled=p.cancelled,
+                    timed_out=p.timed_out,
+                    attempts=attempts,
                 )
             )
 
@@ -606,15 +766,21 @@ def generate_summary(
 
     status_padding = 0
     duration_padding = 0
+    expected_padding = 0
+    wait_padding = 0
     group_padding = 0
     for line in process_summarys:
         status_padding = max(status_padding, len(line.generate_status()))
         duration_padding = max(duration_padding, len(line.generate_duration()))
+        expected_padding = max(expected_padding, len(line.generate_expected()))
+        wait_padding = max(wait_padding, len(line.generate_wait()))
         group_padding = max(group_padding, len(line.generate_group()))
 
     for line in process_summarys:
         line.status = f"{line.generate_status(): <{status_padding}}"
         line.duration = f"{line.generate_duration(): <{duration_padding}}"
+        line.expected = f"{line.generate_expected(): <{expected_padding}}"
+        line.wait = f"{line.generate_wait(): <{wait_padding}}"
         line.group = f"{line.generate_group(): <{group_padding}}"
 
     longest_line = 0
@@ -634,6 +800,13 @@ def format_time_taken(time_taken: float) -> str:
     return f"{seconds}s"
 
 
+def format_attempt(output: ProcessOutput) -> str:
+    if not output.retries:
+        return ""
+
+    return f"(attempt {len(output.attempts) + 1}/{output.retries + 1})"
+
+
 def get_num_lines(line: str, columns: int | None = None) -> int:
     lines = 0
     columns = columns or constants.columns()
@@ -1,15 +1,43 @@
 from __future__ import annotations
 
+import codecs
+import contextlib
+import logging
+import math
+import os
 import signal
+import string
 import subprocess
-import threading
 import time
+from collections import deque
 from io import BufferedReader
-from typing import Any
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Sequence
 
 from typing_extensions import TypeGuard
 
-from pyallel.errors import InvalidLinesModifierError, PyallelError
+from pyallel.cgroup import Cgroup
+from pyallel.errors import (
+    InvalidDependencyModifierError,
+    InvalidFailFastModifierError,
+    InvalidJobsModifierError,
+    InvalidLinesModifierError,
+    InvalidRetriesModifierError,
+    InvalidTimeoutModifierError,
+    PyallelError,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pyallel.reactor import Reactor
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 65536
+MAX_READS_PER_CALL = 16
+# The characters `str.splitlines` treats as line endings
+LINE_ENDINGS = frozenset("\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
 
 
 class ProcessOutput:
@@ -23,84 +51,280 @@ class ProcessOutput:
         end: float = 0.0,
         poll: int | None = None,
         command: str = "",
+        scrollback: int = 0,
+        queued: float = 0.0,
+        queued_reason: str = "",
+        expected: float = 0.0,
+        *,
+        cancelled: bool = False,
+        timed_out: bool = False,
+        retries: int = 0,
+        attempts: Sequence[tuple[float, int]] = (),
     ) -> None:
         self.id = id
-        self.data = data
-        self.lines = len(data.splitlines()) + 1
+        # Completed lines of output (including their line endings), only the last `scrollback`
+        # lines are kept if it is set, so long running commands don't use an unbounded amount of memory
+        self._lines: deque[str] = deque(maxlen=scrollback or None)
+        # The last line of output that hasn't been terminated by a line ending yet
+        self._partial = ""
+        # How many completed lines have been dropped from the start of the output
+        self.dropped_lines = 0
+        # The number of lines needed to display this output, including its status line
+        self.lines = 1
         self.allocated_lines = allocated_lines
         self.allocated_percentage_lines = allocated_percentage_lines
         self.start = start
         self.end = end
         self.poll = poll
         self.command = command
+        # When the process was queued to run, 0 if it was never queued
+        self.queued = queued
+        self.queued_reason = queued_reason
+        self.expected = expected
+        self.cancelled = cancelled
+        self.timed_out = timed_out
+        self.retries = retries
+        # The duration and exit code of each previous attempt at running the process
+        self.attempts = tuple(attempts)
+        self.append(data)
+
+    @property
+    def waiting(self) -> bool:
+        """Whether the process is queued to run but hasn't been started yet."""
+        return bool(self.queued) and not self.start
+
+    @property
+    def data(self) -> str:
+        return "".join(self._lines) + self._partial
+
+    def append(self, data: str) -> None:
+        if not data:
+            return
+
+        lines = (self._partial + data).splitlines(keepends=True)
+        # A trailing carriage return could be the start of a CRLF line ending that was split across reads
+        self._partial = lines.pop() if lines[-1][-1] not in LINE_ENDINGS or lines[-1][-1] == "\r" else ""
+
+        maxlen = self._lines.maxlen
+        if maxlen is not None:
+            self.dropped_lines += max(len(self._lines) + len(lines) - maxlen, 0)
+        self._lines.extend(lines)
+        self._count_lines()
+
+    def splitlines(self) -> list[str]:
+        """Same as `self.data.splitlines()` without joining all of the output together first."""
+        lines = [_strip_line_ending(line) for line in self._lines]
+        if self._partial:
+            lines.append(self._partial.rstrip("\r"))
+        return lines
+
+    def tail(self, num_lines: int) -> list[str]:
+        """Same as `self.data.splitlines()[-num_lines:]`, but only touches the lines being returned."""
+        if num_lines <= 0:
+            return []
+
+        lines: list[str] = []
+        if self._partial:
+            lines.append(self._partial.rstrip("\r"))
+            num_lines -= 1
+
+        lines.extend(_strip_line_ending(line) for line in islice(reversed(self._lines), num_lines))
+        lines.reverse()
+        return lines
+
+    def set_scrollback(self, scrollback: int) -> None:
+        maxlen = scrollback or None
+        if maxlen == self._lines.maxlen:
+            return
+
+        if maxlen is not None:
+            self.dropped_lines += max(len(self._lines) - maxlen, 0)
+        self._lines = deque(self._lines, maxlen=maxlen)
+        self._count_lines()
+
+    def _count_lines(self) -> None:
+        self.lines = len(self._lines) + (2 if self._partial else 1)
 
     def merge(self, other: ProcessOutput) -> None:
         if self.id != other.id:
             raise PyallelError(f"Cannot merge process outputs with different ids: {self.id=}, {other.id=}")
 
-        self.data += other.data
-        self.lines += len(other.data.splitlines())
+        if self._partial:
+            # The start of the new output could complete our unterminated line, so it needs splitting again
+            self.append(other.data)
+        elif other._lines or other._partial:
+            # Otherwise the new output is already split up into lines, so we can just take them as they are
+            maxlen = self._lines.maxlen
+            if maxlen is not None:
+                self.dropped_lines += max(len(self._lines) + len(other._lines) - maxlen, 0)
+            self._lines.extend(other._lines)
+            self._partial = other._partial
+            self._count_lines()
+
         self.allocated_lines = other.allocated_lines
         self.allocated_percentage_lines = other.allocated_percentage_lines
         self.start = other.start
         self.end = other.end
         self.poll = other.poll
+        self.queued = other.queued
+        self.queued_reason = other.queued_reason
+        self.expected = other.expected
+        self.cancelled = other.cancelled
+        self.timed_out = other.timed_out
+        self.retries = other.retries
+        self.attempts = other.attempts
 
 
 class Process:
-    def __init__(self, id: int, command: str, percentage_lines: float = 0.0) -> None:  # noqa: A002
+    def __init__(
+        self,
+        id: int,  # noqa: A002
+        command: str,
+        percentage_lines: float = 0.0,
+        *,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        jobs: int = 0,
+        name: str = "",
+        after: Sequence[str] = (),
+        fail_fast: bool | None = None,
+        timeout: float = 0.0,
+        retries: int = 0,
+    ) -> None:
         self.id = id
         self.command = command
+        # The name other processes in the same group can use to depend on this process
+        self.name = name
+        # The names of the processes that must complete successfully before this process can be run
+        self.after = tuple(after)
+        # When the process was queued to run, 0 if it hasn't been queued
+        self.queued = 0.0
+        # Why the process is being held back from running, other than waiting for its turn
+        self.queued_reason = ""
+        # How long the process is expected to take based on previous runs, 0 if we don't know
+        self.expected = 0.0
         self.start = 0.0
         self.end = 0.0
         self.lines = 0
         self.percentage_lines = percentage_lines
+        # The maximum number of processes that can run at the same time within this process's group, 0 for no limit
+        self.jobs = jobs
+        # Whether to cancel the rest of this process's group as soon as one of them fails, None if not set
+        self.fail_fast = fail_fast
+        # Whether the process was cancelled because another process in its group failed
+        self.cancelled = False
+        # How many seconds the process can run for before it's stopped, 0 for no limit
+        self.timeout = timeout
+        # Whether the process was stopped because it ran for longer than its timeout
+        self.timed_out = False
+        # How many more times to run the process if it fails
+        self.retries = retries
+        # The duration and exit code of each previous attempt at running the process
+        self.attempts: list[tuple[float, int]] = []
+        # When the process can be retried, 0 if it can be run straight away
+        self.retry_at = 0.0
+        # The cgroup to create the process's own cgroup in, None to only use its process group
+        self.cgroup_parent: Path | None = None
+        self._cgroup: Cgroup | None = None
         self._process: subprocess.Popen[bytes]
-        self._buffer: bytes = b""
+        # Output is kept as a list of the chunks read so far and only joined together once it's read,
+        # as appending to a single bytes object copies everything buffered so far on every read
+        self._chunks: list[bytes] = []
         self._stdout: BufferedReader
-        self._lock = threading.Lock()
+        self._stdout_fd = -1
+        self._reactor: Reactor | None = None
+        # Output is decoded incrementally as characters can be split across reads
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors)
+        self._ascii_compatible = _is_ascii_compatible(encoding)
 
-    def run(self) -> None:
+    def run(self, reactor: Reactor | None = None) -> None:
         self.start = time.perf_counter()
+        if self.cgroup_parent is not None and self._cgroup is None:
+            try:
+                self._cgroup = Cgroup.create(self.cgroup_parent, f"pyallel-{os.getpid()}-{self.id}")
+            except OSError:
+                logger.debug("failed to create cgroup for process %d, falling back to its process group", self.id)
+                self.cgroup_parent = None
+
+        # Start the command in its own session, so we can signal everything it starts and not just the shell
         self._process = subprocess.Popen(  # noqa: S602
             self.command,
             stdin=subprocess.DEVNULL,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             shell=True,
+            start_new_session=True,
+            preexec_fn=self._cgroup.join if self._cgroup is not None else None,  # noqa: PLW1509
         )
 
         if not _is_buffered_reader(self._process.stdout):
             raise TypeError(f"Expected stdout to be a BufferedReader, got {self._process.stdout.__class__}")
 
         self._stdout = self._process.stdout
+        # Read from the underlying file descriptor directly without blocking, so a single thread
+        # can service the output of every process instead of needing a reader thread for each one
+        self._stdout_fd = self._stdout.fileno()
+        os.set_blocking(self._stdout_fd, False)
 
-        def _read_stdout() -> None:
-            while True:
-                data = self._stdout.read1(65536)
-                if not data:
-                    break
-                with self._lock:
-                    self._buffer += data
-
-        read_thread = threading.Thread(target=_read_stdout, daemon=True)
-        read_thread.start()
+        if reactor is not None:
+            self._reactor = reactor
+            reactor.watch_exit(self._process.pid)
+            reactor.watch_read(self._stdout_fd, self._read_stdout)
 
     def poll(self) -> int | None:
         if not hasattr(self, "_process"):
-            return -1
+            # Queued processes will be run once there is room for them
+            return None if self.queued else -1
 
         poll = self._process.poll()
         if poll is not None and not self.end:
             self.end = time.perf_counter()
+            # Everything the command wrote before it exited is sitting in the pipe by now,
+            # so make sure it is read before anyone sees that the command has completed
+            self._read_stdout()
         return poll
 
+    def retry(self, delay: float = 0.0) -> None:
+        """Record the current attempt and reset the process, so it can be run again once `delay` seconds have passed."""
+        self.attempts.append((self.end - self.start, self._process.returncode))
+        # Make sure nothing the previous attempt started is left running alongside the next one
+        self.kill()
+        if self._stdout_fd != -1:
+            # Something the command started is still holding on to its output, we don't want
+            # that getting mixed up with the output of the next attempt
+            if self._reactor is not None:
+                self._reactor.unwatch(self._stdout_fd)
+            self._stdout.close()
+            self._stdout_fd = -1
+
+        del self._process
+        self.start = 0.0
+        self.end = 0.0
+        self.timed_out = False
+        self.queued = time.perf_counter()
+        self.retry_at = self.queued + delay
+
     def read(self) -> bytes:
-        with self._lock:
-            buffer = self._buffer
-            self._buffer = b""
+        self._read_stdout()
+        chunks = self._chunks
+        if not chunks:
+            return b""
+
+        self._chunks = []
+        if len(chunks) == 1:
+            return chunks[0]
+
+        return b"".join(chunks)
+
+    def read_text(self) -> str:
+        data = self.read()
+        # Most output is plain ASCII, which doesn't need the overhead of the incremental decoder,
+        # provided it isn't holding on to the start of a character from a previous read
+        if self._ascii_compatible and data.isascii() and not self._decoder.getstate()[0]:
+            return data.decode("ascii")
 
-        return buffer
+        # Flush out anything left in the decoder once we know there is no more output to come
+        return self._decoder.decode(data, final=self._stdout_fd == -1)
 
     def return_code(self) -> int | None:
         if not hasattr(self, "_process"):
@@ -108,12 +332,57 @@ class Process:
         return self._process.returncode
 
     def interrupt(self) -> None:
-        if hasattr(self, "_process"):
-            self._process.send_signal(signal.SIGINT)
+        self._signal(signal.SIGINT)
+
+    def terminate(self) -> None:
+        self._signal(signal.SIGTERM)
 
     def kill(self) -> None:
-        if hasattr(self, "_process"):
-            self._process.send_signal(signal.SIGKILL)
+        self._signal(signal.SIGKILL)
+
+    def close(self) -> None:
+        """Kill anything the process left running and remove its cgroup."""
+        self.kill()
+        if self._cgroup is not None:
+            self._cgroup.remove()
+            self._cgroup = None
+
+    def _signal(self, signum: int) -> None:
+        if not hasattr(self, "_process"):
+            return
+
+        # Signal every process the command has started, even once the shell has exited, as anything
+        # left running can hold on to its output and stop us from ever seeing EOF
+        if self._cgroup is not None:
+            self._cgroup.signal(signum)
+            return
+
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(self._process.pid, signum)
+
+    def _read_stdout(self) -> None:
+        if self._stdout_fd == -1:
+            return
+
+        # Limit how much we read in one go so a single chatty command can't starve the others
+        for _ in range(MAX_READS_PER_CALL):
+            try:
+                data = os.read(self._stdout_fd, READ_SIZE)
+            except BlockingIOError:
+                return
+
+            if not data:
+                break
+
+            self._chunks.append(data)
+        else:
+            return
+
+        # We've reached EOF so there is nothing left to read
+        if self._reactor is not None:
+            self._reactor.unwatch(self._stdout_fd)
+        self._stdout.close()
+        self._stdout_fd = -1
 
     def wait(self) -> int:
         if not hasattr(self, "_process"):
@@ -121,32 +390,103 @@ class Process:
         return self._process.wait()
 
     @classmethod
-    def from_command(cls, id: int, command: str) -> Process:  # noqa: A002
+    def from_command(
+        cls,
+        id: int,  # noqa: A002
+        command: str,
+        *,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+    ) -> Process:
         cmd = command.split(" :::: ", maxsplit=1)
         if len(cmd) == 1:
-            return cls(id, cmd[0].strip())
+            return cls(id, cmd[0].strip(), encoding=encoding, errors=errors)
 
         args, *parts = cmd
 
         percentage_lines = 0
+        jobs = 0
+        name = ""
+        after: list[str] = []
+        fail_fast = None
+        timeout = 0.0
+        retries = 0
         for arg in args.split(" "):
             try:
-                name, value = arg.split("=")
+                modifier, value = arg.split("=")
             except ValueError:
                 continue
 
-            if name == "lines":
+            if modifier == "lines":
+                percentage_lines = _parse_int_modifier(
+                    value, 1, 100, InvalidLinesModifierError("lines modifier must be a number between 1 and 100")
+                )
+            elif modifier == "jobs":
+                jobs = _parse_int_modifier(
+                    value, 1, None, InvalidJobsModifierError("jobs modifier must be a number greater than 0")
+                )
+            elif modifier == "retries":
+                retries = _parse_int_modifier(
+                    value, 1, None, InvalidRetriesModifierError("retries modifier must be a number greater than 0")
+                )
+            elif modifier == "name":
+                if not value:
+                    raise InvalidDependencyModifierError("name modifier must not be empty")
+                name = value
+            elif modifier == "after":
+                after = [dependency for dependency in value.split(",") if dependency]
+                if not after:
+                    raise InvalidDependencyModifierError("after modifier must be a comma separated list of names")
+            elif modifier == "fail_fast":
+                if value not in {"yes", "no"}:
+                    raise InvalidFailFastModifierError("fail_fast modifier must be either yes or no")
+                fail_fast = value == "yes"
+            elif modifier == "timeout":
+                error = InvalidTimeoutModifierError("timeout modifier must be a number of seconds greater than 0")
                 try:
-                    percentage_lines = int(value)
+                    timeout = float(value)
                 except ValueError:
-                    raise InvalidLinesModifierError("lines modifier must be a number between 1 and 100")
+                    raise error
 
-                if not 0 < percentage_lines <= 100:  # noqa: PLR2004
-                    raise InvalidLinesModifierError("lines modifier must be a number between 1 and 100")
+                if not 0 < timeout < math.inf:
+                    raise error
+
+        return cls(
+            id,
+            " ".join(parts).strip(),
+            round(percentage_lines / 100, 2),
+            encoding=encoding,
+            errors=errors,
+            jobs=jobs,
+            name=name,
+            after=after,
+            fail_fast=fail_fast,
+            timeout=timeout,
+            retries=retries,
+        )
+
+
+def _parse_int_modifier(value: str, minimum: int, maximum: int | None, error: PyallelError) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise error
+
+    if number < minimum or (maximum is not None and number > maximum):
+        raise error
+
+    return number
+
+
+def _is_ascii_compatible(encoding: str) -> bool:
+    try:
+        return string.printable.encode(encoding) == string.printable.encode("ascii")
+    except UnicodeError:
+        return False
 
-                break
 
-        return cls(id, " ".join(parts).strip(), round(percentage_lines / 100, 2))
+def _strip_line_ending(line: str) -> str:
+    return line[:-2] if line.endswith("\r\n") else line[:-1]
 
 
 def _is_buffered_reader(stdout: Any) -> TypeGuard[BufferedReader]:
@@ -1,13 +1,28 @@
 from __future__ import annotations
 
-from typing import Sequence
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Sequence
 
+from pyallel import constants
 from pyallel.errors import (
+    InvalidDependencyModifierError,
+    InvalidFailFastModifierError,
+    InvalidJobsModifierError,
     InvalidLinesModifierError,
     PyallelError,
 )
 from pyallel.process import Process, ProcessOutput
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pyallel.load import LoadLimits
+    from pyallel.reactor import Reactor
+
+# How a process that has timed out is stopped, each one is tried in turn until it exits
+TIMEOUT_SIGNALS = ("interrupt", "terminate", "kill")
+
 
 class ProcessGroupOutput:
     def __init__(self, id: int, processes: Sequence[ProcessOutput], interrupt_count: int = 0) -> None:  # noqa: A002
@@ -23,14 +38,52 @@ class ProcessGroupOutput:
 
 
 class ProcessGroup:
-    def __init__(self, id: int, processes: list[Process]) -> None:  # noqa: A002
+    def __init__(
+        self,
+        id: int,  # noqa: A002
+        processes: list[Process],
+        jobs: int = 0,
+        load_limits: LoadLimits | None = None,
+        *,
+        fail_fast: bool = False,
+        grace_period: float = constants.DEFAULT_GRACE_PERIOD,
+    ) -> None:
         self.id = id
         self.processes = processes
+        # The maximum number of processes to run at the same time, 0 for no limit
+        self.jobs = jobs
+        # Processes aren't started while the system is too busy
+        self.load_limits = load_limits
+        # Cancel the rest of the processes as soon as one of them fails
+        self.fail_fast = fail_fast
+        # How long to give processes to exit after each signal we send them when stopping them
+        self.grace_period = grace_period
+        # How many signals have been sent to each process that has timed out, by process id
+        self._timeout_signals: dict[int, int] = {}
+        # When the remaining processes were cancelled after one of them failed, 0 if they haven't been
+        self._cancelled_at = 0.0
+        self._killed = False
         self._exit_code = 0
         self._interrupt_count = 0
+        self._queue: deque[Process] = deque()
+        self._reactor: Reactor | None = None
+        self._named_processes = {process.name: process for process in processes if process.name}
 
     @classmethod
-    def from_commands(cls, id: int, process_id: int, *commands: str) -> ProcessGroup:  # noqa: A002
+    def from_commands(
+        cls,
+        id: int,  # noqa: A002
+        process_id: int,
+        *commands: str,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        jobs: int = 0,
+        load_limits: LoadLimits | None = None,
+        fail_fast: bool = False,
+        timeout: float = 0.0,
+        grace_period: float = constants.DEFAULT_GRACE_PERIOD,
+        cgroup_parent: Path | None = None,
+    ) -> ProcessGroup:
         cmds: list[str] = []
         processes: list[Process] = []
 
@@ -40,13 +93,13 @@ class ProcessGroup:
                 cmds.append(command)
                 continue
 
-            process = Process.from_command(i + process_id, " ".join(cmds))
+            process = Process.from_command(i + process_id, " ".join(cmds), encoding=encoding, errors=errors)
             percentage_lines_sum += process.percentage_lines
             processes.append(process)
             cmds.clear()
 
         if cmds:
-            process = Process.from_command(i + process_id, " ".join(cmds))
+            process = Process.from_command(i + process_id, " ".join(cmds), encoding=encoding, errors=errors)
             percentage_lines_sum += process.percentage_lines
             processes.append(process)
 
@@ -55,29 +108,191 @@ class ProcessGroup:
                 "lines modifier must not exceed 100 across all processes within each process group"
             )
 
-        return cls(id=id, processes=processes)
+        # The jobs modifier applies to the whole process group, so it overrides the default given to us
+        group_jobs = {process.jobs for process in processes if process.jobs}
+        if len(group_jobs) > 1:
+            raise InvalidJobsModifierError(
+                "jobs modifier must be set to the same value for all processes within each process group"
+            )
+        if group_jobs:
+            jobs = group_jobs.pop()
+
+        group_fail_fast = {process.fail_fast for process in processes if process.fail_fast is not None}
+        if len(group_fail_fast) > 1:
+            raise InvalidFailFastModifierError(
+                "fail_fast modifier must be set to the same value for all processes within each process group"
+            )
+        if group_fail_fast:
+            fail_fast = group_fail_fast.pop()
+
+        _check_dependencies(processes)
 
-    def run(self) -> None:
+        # The timeout modifier only applies to the process it's set on, so it overrides the default for that process
+        for process in processes:
+            process.timeout = process.timeout or timeout
+            process.cgroup_parent = cgroup_parent
+
+        return cls(
+            id=id,
+            processes=processes,
+            jobs=jobs,
+            load_limits=load_limits,
+            fail_fast=fail_fast,
+            grace_period=grace_period,
+        )
+
+    def run(self, reactor: Reactor | None = None) -> None:
+        self._reactor = reactor
+        queued = time.perf_counter()
         for process in self.processes:
-            process.run()
+            process.queued = queued
+        # Start the processes that hold up the most work first, so we aren't left waiting on
+        # one long process at the end when there is a limit on how many can run at once
+        critical_paths = _critical_paths(self.processes)
+        self._queue.extend(sorted(self.processes, key=lambda process: critical_paths[process.id], reverse=True))
+        self._run_queued()
+
+    def _run_queued(self) -> None:
+        if not self._queue:
+            return
+
+        now = time.perf_counter()
+        for process in self._queue:
+            process.queued_reason = "waiting to retry" if process.retry_at > now else ""
+
+        running = sum(1 for process in self.processes if process.start and process.poll() is None)
+        # Starting or cancelling a process can affect the processes that depend on it,
+        # so keep going until there is nothing more we can do right now
+        changed = True
+        while changed:
+            changed = False
+            for process in list(self._queue):
+                polls = [self._named_processes[name].poll() for name in process.after]
+                if any(poll is not None and poll != 0 for poll in polls):
+                    # A dependency failed or was never run, so this process can't be run either
+                    self._queue.remove(process)
+                    process.queued = 0.0
+                    changed = True
+                elif None not in polls and process.retry_at <= now and (not self.jobs or running < self.jobs):
+                    # Always let something run, otherwise we could end up waiting forever on load we aren't causing
+                    process.queued_reason = self.load_limits.check() if self.load_limits and running else ""
+                    if process.queued_reason:
+                        continue
+
+                    self._queue.remove(process)
+                    process.run(self._reactor)
+                    running += 1
+                    changed = True
+
+    @property
+    def throttled(self) -> bool:
+        """Whether any processes are being held back until the system is less busy."""
+        return any(process.queued_reason for process in self._queue)
 
     def poll(self) -> int | None:
-        polls: list[int | None] = [process.poll() for process in self.processes]
+        self._stop_timed_out()
+        self._retry_failed()
 
-        running = [p for p in polls if p is None]
-        failed = [p for p in polls if p is not None and p > 0]
+        polls: list[int | None] = [process.poll() for process in self.processes]
+        failed = [process.timed_out or (poll is not None and poll > 0) for process, poll in zip(self.processes, polls)]
+        if self.fail_fast and any(failed):
+            # Make sure nothing else is started and cancel whatever is still running
+            self._cancel()
+        elif self._queue:
+            # Start any queued processes that now have room to run, the reactor
+            # wakes us up whenever a process exits so this happens straight away
+            self._run_queued()
+            polls = [process.poll() for process in self.processes]
 
-        if running:
+        if None in polls:
             return None
-        if failed:
+        if any(failed):
             return 1
         return 0
 
+    @property
+    def deadline(self) -> float | None:
+        """When the group next needs to be polled regardless of whether anything has happened, if ever."""
+        deadlines: list[float] = []
+        if self._cancelled_at and not self._killed:
+            deadlines.append(self._cancelled_at + self.grace_period)
+
+        now = time.perf_counter()
+        deadlines.extend(process.retry_at for process in self._queue if process.retry_at > now)
+
+        for process in self.processes:
+            signals = self._timeout_signals.get(process.id, 0)
+            if process.timeout and process.start and not process.end and signals < len(TIMEOUT_SIGNALS):
+                deadlines.append(process.start + process.timeout + signals * self.grace_period)
+
+        return min(deadlines, default=None)
+
+    def _stop_timed_out(self) -> None:
+        now = time.perf_counter()
+        for process in self.processes:
+            if not process.timeout or not process.start or process.poll() is not None:
+                continue
+
+            overdue = now - process.start - process.timeout
+            if overdue < 0:
+                continue
+
+            # Send a more forceful signal each grace period the process is still running for, skipping
+            # straight to the last one that is due if we're late, as sending the others would be pointless
+            due = min(
+                int(overdue // self.grace_period) + 1 if self.grace_period else len(TIMEOUT_SIGNALS),
+                len(TIMEOUT_SIGNALS),
+            )
+            if due > self._timeout_signals.get(process.id, 0):
+                self._timeout_signals[process.id] = due
+                process.timed_out = True
+                getattr(process, TIMEOUT_SIGNALS[due - 1])()
+
+    def _retry_failed(self) -> None:
+        # Nothing should be run again once we've been told to stop
+        if self._interrupt_count or self._cancelled_at:
+            return
+
+        for process in self.processes:
+            if not process.start or len(process.attempts) >= process.retries:
+                continue
+
+            poll = process.poll()
+            if poll is None or (poll == 0 and not process.timed_out):
+                continue
+
+            # Back off exponentially so a command that is failing because of something
+            # outside of our control has a chance to recover before it's run again
+            process.retry(constants.RETRY_BACKOFF * 2 ** len(process.attempts))
+            self._timeout_signals.pop(process.id, None)
+            self._queue.appendleft(process)
+
+    def _cancel(self) -> None:
+        # Use the same escalation as interrupts, start by asking the remaining processes to stop,
+        # then kill any that are still running once they've had time to clean up after themselves
+        if not self._cancelled_at:
+            self._cancelled_at = time.perf_counter()
+            for process in self._queue:
+                process.queued = 0.0
+                process.queued_reason = ""
+                process.cancelled = True
+            self._queue.clear()
+
+            for process in self.processes:
+                if process.start and process.poll() is None and not process.timed_out:
+                    process.cancelled = True
+                    process.interrupt()
+        elif not self._killed and time.perf_counter() >= self._cancelled_at + self.grace_period:
+            self._killed = True
+            for process in self.processes:
+                if process.cancelled:
+                    process.kill()
+
     def stream(self) -> ProcessGroupOutput:
         process_outputs: list[ProcessOutput] = []
         for process in self.processes:
             poll = process.poll()
-            data = process.read().decode()
+            data = process.read_text()
             process_outputs.append(
                 ProcessOutput(
                     id=process.id,
@@ -88,12 +303,25 @@ class ProcessGroup:
                     end=process.end,
                     poll=poll,
                     command=process.command,
+                    queued=process.queued,
+                    queued_reason=process.queued_reason,
+                    expected=process.expected,
+                    cancelled=process.cancelled,
+                    timed_out=process.timed_out,
+                    retries=process.retries,
+                    attempts=process.attempts,
                 )
             )
 
         return ProcessGroupOutput(id=self.id, processes=process_outputs, interrupt_count=self._interrupt_count)
 
     def handle_signal(self, _signum: int) -> None:
+        # Don't start anything new once we've been interrupted
+        for process in self._queue:
+            process.queued = 0.0
+            process.queued_reason = ""
+        self._queue.clear()
+
         for process in self.processes:
             if self._interrupt_count == 0:
                 process.interrupt()
@@ -101,3 +329,55 @@ class ProcessGroup:
                 process.kill()
 
         self._interrupt_count += 1
+
+
+def _check_dependencies(processes: list[Process]) -> None:
+    names: set[str] = set()
+    for process in processes:
+        if process.name in names:
+            raise InvalidDependencyModifierError(
+                f"name modifier must be unique within each process group, {process.name!r} is used more than once"
+            )
+        if process.name:
+            names.add(process.name)
+
+    for process in processes:
+        for name in process.after:
+            if name not in names:
+                raise InvalidDependencyModifierError(
+                    f"after modifier must refer to the name of a command in the same process group, got {name!r}"
+                )
+
+    # Repeatedly remove the named processes whose dependencies have all been removed, anything left over
+    # must depend on itself through a cycle (unnamed processes can't be depended on so can't be part of one)
+    remaining = {process.name: set(process.after) for process in processes if process.name}
+    while remaining:
+        ready = {name for name, after in remaining.items() if not after}
+        if not ready:
+            cycle = ", ".join(sorted(remaining))
+            raise InvalidDependencyModifierError(f"after modifiers must not form a cycle, check: {cycle}")
+        for name in ready:
+            del remaining[name]
+        for after in remaining.values():
+            after.difference_update(ready)
+
+
+def _critical_paths(processes: list[Process]) -> dict[int, float]:
+    """Return how long each process is expected to take, along with the longest chain of processes that depend on it."""
+    dependents: dict[str, list[Process]] = {}
+    for process in processes:
+        for name in process.after:
+            dependents.setdefault(name, []).append(process)
+
+    paths: dict[int, float] = {}
+
+    def critical_path(process: Process) -> float:
+        if process.id not in paths:
+            after = dependents.get(process.name, []) if process.name else []
+            paths[process.id] = process.expected + max((critical_path(p) for p in after), default=0.0)
+        return paths[process.id]
+
+    for process in processes:
+        critical_path(process)
+
+    return paths
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import signal
+import time
 from typing import TYPE_CHECKING, Any
 
+from pyallel import constants
 from pyallel.errors import NoCommandsForProcessGroupError, PyallelError
 from pyallel.process_group import ProcessGroup, ProcessGroupOutput
+from pyallel.reactor import Reactor
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
+    from pathlib import Path
+
+    from pyallel.load import LoadLimits
 
 
 class ProcessGroupManager:
@@ -17,9 +23,21 @@ class ProcessGroupManager:
         self._process_groups = process_groups.copy()
         self._cur_process_group: ProcessGroup | None = None
         self.groups: Sequence[ProcessGroup] = process_groups
+        self.reactor = Reactor()
 
     @classmethod
-    def from_args(cls, *args: str) -> ProcessGroupManager:
+    def from_args(
+        cls,
+        *args: str,
+        encoding: str = "utf-8",
+        errors: str = "replace",
+        jobs: int = 0,
+        load_limits: LoadLimits | None = None,
+        fail_fast: bool = False,
+        timeout: float = 0.0,
+        grace_period: float = constants.DEFAULT_GRACE_PERIOD,
+        cgroup_parent: Path | None = None,
+    ) -> ProcessGroupManager:
         commands: list[str] = []
         process_groups: list[ProcessGroup] = []
         progress_group_id = 1
@@ -35,14 +53,40 @@ class ProcessGroupManager:
                     f"no commands provided for process group {progress_group_id}, did you forgot to provide them before the ::: symbol?"
                 )
 
-            pg = ProcessGroup.from_commands(progress_group_id, process_id, *commands)
+            pg = ProcessGroup.from_commands(
+                progress_group_id,
+                process_id,
+                *commands,
+                encoding=encoding,
+                errors=errors,
+                jobs=jobs,
+                load_limits=load_limits,
+                fail_fast=fail_fast,
+                timeout=timeout,
+                grace_period=grace_period,
+                cgroup_parent=cgroup_parent,
+            )
             process_groups.append(pg)
             process_id += len(pg.processes)
             progress_group_id += 1
             commands.clear()
 
         if commands:
-            process_groups.append(ProcessGroup.from_commands(progress_group_id, process_id, *commands))
+            process_groups.append(
+                ProcessGroup.from_commands(
+                    progress_group_id,
+                    process_id,
+                    *commands,
+                    encoding=encoding,
+                    errors=errors,
+                    jobs=jobs,
+                    load_limits=load_limits,
+                    fail_fast=fail_fast,
+                    timeout=timeout,
+                    grace_period=grace_period,
+                    cgroup_parent=cgroup_parent,
+                )
+            )
 
         process_group_manager = cls(process_groups=process_groups)
 
@@ -54,7 +98,7 @@ class ProcessGroupManager:
     def run(self) -> None:
         if self._process_groups:
             self._cur_process_group = self._process_groups.pop(0)
-            self._cur_process_group.run()
+            self._cur_process_group.run(self.reactor)
         else:
             self._cur_process_group = None
 
@@ -75,10 +119,29 @@ class ProcessGroupManager:
     def stream(self) -> ProcessGroupOutput:
         return self.cur_process_group.stream()
 
+    def wait(self, timeout: float | None = None) -> None:
+        # Nothing wakes us up when the system becomes less busy, so we need to check back periodically
+        if self.cur_process_group.throttled and (timeout is None or timeout > constants.LOAD_CHECK_INTERVAL):
+            timeout = constants.LOAD_CHECK_INTERVAL
+        deadline = self.cur_process_group.deadline
+        if deadline is not None:
+            until_deadline = max(deadline - time.perf_counter(), 0.0)
+            if timeout is None or timeout > until_deadline:
+                timeout = until_deadline
+        self.reactor.wait(timeout)
+
+    def close(self) -> None:
+        """Clean up after every process that has been run, including anything they left running."""
+        for group in self.groups:
+            for process in group.processes:
+                process.close()
+
     def handle_signal(self, signum: int, _frame: Any) -> None:
         self.cur_process_group.handle_signal(signum)
         self._exit_code = 128 + signum
         self._interrupt_count += 1
+        # Make sure the main loop picks up the interrupt straight away
+        self.reactor.wake()
 
     @property
     def cur_process_group(self) -> ProcessGroup:
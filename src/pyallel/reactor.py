@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import selectors
+from functools import partial
+from typing import Callable
+
+from pyallel import constants
+
+logger = logging.getLogger(__name__)
+
+
+class Reactor:
+    """Multiplex the output and exits of every running process in a single thread.
+
+    The main loop is woken up when a child process produces output, a child process exits,
+    a signal is received or the given timeout expires, instead of polling on a fixed interval.
+    Output is read as soon as it is available using the callbacks registered with `watch_read`.
+    """
+
+    def __init__(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        # Self-pipe used to wake up the main loop from signal handlers
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ, self._drain_wakeup)
+        # Without pidfds we have no way of being told about child exits directly,
+        # so we need to make sure we never block for too long while children are running
+        self._exit_fallback = False
+        self._pidfds: set[int] = set()
+
+    def wake(self) -> None:
+        # If the pipe is full there is already a wake up pending
+        with contextlib.suppress(BlockingIOError):
+            os.write(self._wakeup_write, b"\0")
+
+    def watch_read(self, fd: int, callback: Callable[[], None]) -> None:
+        self._selector.register(fd, selectors.EVENT_READ, callback)
+
+    def unwatch(self, fd: int) -> None:
+        with contextlib.suppress(KeyError):
+            self._selector.unregister(fd)
+
+    def watch_exit(self, pid: int) -> None:
+        if not hasattr(os, "pidfd_open"):
+            self._exit_fallback = True
+            return
+
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            logger.debug("failed to open pidfd for pid %d, falling back to timed wake ups", pid)
+            self._exit_fallback = True
+            return
+
+        self._pidfds.add(pidfd)
+        self._selector.register(pidfd, selectors.EVENT_READ, partial(self._close_pidfd, pidfd))
+
+    def wait(self, timeout: float | None = None) -> None:
+        if self._exit_fallback and (timeout is None or timeout > constants.MAX_WAIT_BETWEEN_RENDERS):
+            timeout = constants.MAX_WAIT_BETWEEN_RENDERS
+
+        for key, _ in self._selector.select(timeout):
+            key.data()
+
+    def close(self) -> None:
+        for pidfd in self._pidfds:
+            os.close(pidfd)
+        self._pidfds.clear()
+        self._selector.close()
+        os.close(self._wakeup_read)
+        os.close(self._wakeup_write)
+
+    def _drain_wakeup(self) -> None:
+        with contextlib.suppress(BlockingIOError):
+            while os.read(self._wakeup_read, 4096):
+                pass
+
+    def _close_pidfd(self, pidfd: int) -> None:
+        # A pidfd stays readable once its process has exited, so stop watching it
+        self._selector.unregister(pidfd)
+        self._pidfds.discard(pidfd)
+        os.close(pidfd)
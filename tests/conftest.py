@@ -1,4 +1,5 @@
 import signal
+from pathlib import Path
 from typing import Generator
 from unittest.mock import MagicMock, patch
 
@@ -11,3 +12,10 @@ def mock_signal() -> Generator[MagicMock, None, None]:
     # the test suite via pytest
     with patch.object(signal, "signal") as mock:
         yield mock
+
+
+@pytest.fixture(autouse=True)
+def history_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Make sure we don't read or write the real history of command durations when running the test suite
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    return tmp_path
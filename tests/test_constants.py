@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import shutil
+import signal
+from unittest.mock import MagicMock, patch
+
+from pyallel.constants import TerminalSize
+
+
+@patch.object(shutil, "get_terminal_size")
+def test_terminal_size(get_terminal_size_mock: MagicMock) -> None:
+    get_terminal_size_mock.return_value = os.terminal_size((80, 24))
+    terminal_size = TerminalSize()
+    assert terminal_size.columns() == 80
+    assert terminal_size.lines() == 24
+
+    get_terminal_size_mock.return_value = os.terminal_size((100, 50))
+    assert terminal_size.columns() == 80
+    assert terminal_size.lines() == 24
+    get_terminal_size_mock.assert_called_once()
+
+
+@patch.object(shutil, "get_terminal_size")
+def test_terminal_size_refresh(get_terminal_size_mock: MagicMock) -> None:
+    get_terminal_size_mock.return_value = os.terminal_size((80, 24))
+    terminal_size = TerminalSize()
+    callback = MagicMock()
+    terminal_size.on_resize(callback)
+
+    terminal_size.refresh()
+    callback.assert_not_called()
+
+    get_terminal_size_mock.return_value = os.terminal_size((100, 50))
+    terminal_size.handle_signal(signal.SIGWINCH, MagicMock())
+    assert terminal_size.columns() == 100
+    assert terminal_size.lines() == 50
+    callback.assert_called_once()
+
+
+def test_terminal_size_watch(mock_signal: MagicMock) -> None:
+    terminal_size = TerminalSize()
+    terminal_size.watch()
+    mock_signal.assert_called_once_with(signal.SIGWINCH, terminal_size.handle_signal)
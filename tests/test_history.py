@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from pyallel import history
+from pyallel.history import DurationHistory
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def test_default_path(history_dir: Path) -> None:
+    assert history.default_path() == history_dir / "pyallel" / "history.json"
+
+
+def test_expected_unknown_command(tmp_path: Path) -> None:
+    duration_history = DurationHistory.load(tmp_path / "history.json", cwd="/src")
+    assert duration_history.expected("make") == 0.0
+
+
+def test_record_and_save(tmp_path: Path) -> None:
+    path = tmp_path / "history.json"
+    duration_history = DurationHistory.load(path, cwd="/src")
+    duration_history.record("make", 2.0)
+    duration_history.save()
+
+    assert DurationHistory.load(path, cwd="/src").expected("make") == 2.0
+    assert DurationHistory.load(path, cwd="/other").expected("make") == 0.0
+    assert json.loads(path.read_text()) == [["/src", "make", 2.0]]
+
+
+def test_record_smooths_durations(tmp_path: Path) -> None:
+    duration_history = DurationHistory.load(tmp_path / "history.json", cwd="/src")
+    duration_history.record("make", 2.0)
+    duration_history.record("make", 4.0)
+    assert duration_history.expected("make") == 3.0
+
+
+def test_save_keeps_other_runs_durations(tmp_path: Path) -> None:
+    path = tmp_path / "history.json"
+    first = DurationHistory.load(path, cwd="/src")
+    second = DurationHistory.load(path, cwd="/src")
+    first.record("make", 1.0)
+    first.save()
+    second.record("make test", 2.0)
+    second.save()
+
+    duration_history = DurationHistory.load(path, cwd="/src")
+    assert duration_history.expected("make") == 1.0
+    assert duration_history.expected("make test") == 2.0
+
+
+def test_save_forgets_least_recently_run(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(history, "MAX_ENTRIES", 2)
+    path = tmp_path / "history.json"
+    duration_history = DurationHistory.load(path, cwd="/src")
+    for command in ("first", "second", "third"):
+        duration_history.record(command, 1.0)
+    duration_history.save()
+
+    assert [command for _, command, _ in json.loads(path.read_text())] == ["second", "third"]
+
+
+def test_load_ignores_invalid_history(tmp_path: Path) -> None:
+    path = tmp_path / "history.json"
+    path.write_text("not json")
+    assert DurationHistory.load(path, cwd="/src").expected("make") == 0.0
+
+    path.write_text(json.dumps([["/src", "make", 1.0], ["/src", "bad"], "bad", ["/src", "bad", "1"]]))
+    duration_history = DurationHistory.load(path, cwd="/src")
+    assert duration_history.expected("make") == 1.0
+    assert duration_history.expected("bad") == 0.0
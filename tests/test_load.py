@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+
+from pyallel import load
+from pyallel.load import LoadLimits
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def write_proc_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, *, load_1: str, available_kb: str, cpu_pressure: str
+) -> None:
+    loadavg = tmp_path / "loadavg"
+    loadavg.write_text(f"{load_1} 0.20 0.21 2/71 686\n")
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text(
+        f"MemTotal:        6147400 kB\nMemFree:         4964180 kB\nMemAvailable:    {available_kb} kB\n"
+    )
+    cpu = tmp_path / "cpu"
+    cpu.write_text(
+        f"some avg10={cpu_pressure} avg60=3.19 avg300=3.07 total=65950514\nfull avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+    )
+    monkeypatch.setattr(load, "LOADAVG_PATH", str(loadavg))
+    monkeypatch.setattr(load, "MEMINFO_PATH", str(meminfo))
+    monkeypatch.setattr(load, "PRESSURE_PATHS", {"cpu": str(cpu), "io": str(tmp_path / "missing")})
+
+
+def test_read_proc_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    write_proc_files(tmp_path, monkeypatch, load_1="1.50", available_kb="2097152", cpu_pressure="12.50")
+    assert load.read_load() == 1.5
+    assert load.read_available_memory() == 2048
+    assert load.read_pressure(load.PRESSURE_PATHS["cpu"]) == 12.5
+    assert load.read_pressure(load.PRESSURE_PATHS["io"]) is None
+
+
+def test_load_limits_disabled() -> None:
+    assert not LoadLimits()
+    assert LoadLimits(max_load=1.0)
+
+
+def test_load_limits_check(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    write_proc_files(tmp_path, monkeypatch, load_1="1.50", available_kb="2097152", cpu_pressure="12.50")
+    assert LoadLimits(max_load=2, min_memory=1024, max_pressure=20).check() == ""
+    assert LoadLimits(max_load=1).check() == "load 1.50 > 1"
+    assert LoadLimits(min_memory=4096).check() == "memory 2048MiB < 4096MiB"
+    assert LoadLimits(max_pressure=10).check() == "cpu pressure 12.5% > 10%"
+
+
+@patch.object(load, "read_load", return_value=1.5)
+def test_load_limits_check_is_cached(read_load_mock: MagicMock) -> None:
+    limits = LoadLimits(max_load=1)
+    assert limits.check() == "load 1.50 > 1"
+    read_load_mock.return_value = 0.5
+    assert limits.check() == "load 1.50 > 1"
+    read_load_mock.assert_called_once()
@@ -1,10 +1,18 @@
+from __future__ import annotations
+
 import difflib
 import re
-from typing import Sequence
+from typing import TYPE_CHECKING, Sequence
 
 import pytest
 
 from pyallel import constants, main
+from pyallel.process_group_manager import ProcessGroupManager
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pyallel.process_group import ProcessGroupOutput
 
 
 def prettify_error(out: str) -> str:
@@ -102,6 +110,62 @@ class TestInteractiveMode:
         captured = capsys.readouterr()
         assert exit_code == 0, prettify_error(captured.out)
 
+    def test_run_with_scrollback(self, capsys: pytest.CaptureFixture[str]) -> None:
+        exit_code = main.entry_point("seq 10", "--scrollback", "2", "-t")
+        captured = capsys.readouterr()
+        assert exit_code == 0, prettify_error(captured.out)
+
+    @pytest.mark.parametrize("jobs", ["1", "auto"])
+    def test_run_with_jobs(self, capsys: pytest.CaptureFixture[str], jobs: str) -> None:
+        exit_code = main.entry_point("echo hi", "::", "echo bye", "--jobs", jobs, "-t")
+        captured = capsys.readouterr()
+        assert exit_code == 0, prettify_error(captured.out)
+
+    def test_run_with_jobs_modifier(self, capsys: pytest.CaptureFixture[str]) -> None:
+        exit_code = main.entry_point("jobs=1 :::: echo hi", "::", "echo bye", "-t")
+        captured = capsys.readouterr()
+        assert exit_code == 0, prettify_error(captured.out)
+
+    def test_run_with_dependency_modifiers(self, capsys: pytest.CaptureFixture[str]) -> None:
+        exit_code = main.entry_point("name=first :::: echo hi", "::", "after=first :::: echo bye", "-t")
+        captured = capsys.readouterr()
+        assert exit_code == 0, prettify_error(captured.out)
+
+    def test_run_with_unknown_dependency(self, capsys: pytest.CaptureFixture[str]) -> None:
+        exit_code = main.entry_point("after=first :::: echo hi", "--colour", "no")
+        captured = capsys.readouterr()
+        assert exit_code == 1, prettify_error(captured.out)
+        compare_output(
+            actual=captured.out.splitlines(),
+            expected=[
+                "Error: after modifier must refer to the name of a command in the same process group, got 'first'",
+            ],
+        )
+
+    def test_run_with_fail_fast(self, capsys: pytest.CaptureFixture[str]) -> None:
+        exit_code = main.entry_point("exit 1", "::", "exec sleep 5", "-f", "--colour", "no")
+        captured = capsys.readouterr()
+        assert exit_code == 1, prettify_error(captured.out)
+        assert f"cancelled {constants.X}" in captured.out, prettify_error(captured.out)
+
+    def test_run_with_timeout(self, capsys: pytest.CaptureFixture[str]) -> None:
+        exit_code = main.entry_point("exec sleep 5", "--timeout", "0.1", "--colour", "no")
+        captured = capsys.readouterr()
+        assert exit_code == 1, prettify_error(captured.out)
+        assert f"timed out {constants.X}" in captured.out, prettify_error(captured.out)
+
+    def test_run_records_history(self, capsys: pytest.CaptureFixture[str]) -> None:
+        assert main.entry_point("echo hi", "-t") == 0
+        assert main.entry_point("echo hi", "--colour", "no") == 0
+        captured = capsys.readouterr()
+        assert "(expected " in captured.out, prettify_error(captured.out)
+
+    def test_run_without_history(self, capsys: pytest.CaptureFixture[str], history_dir: Path) -> None:
+        exit_code = main.entry_point("echo hi", "-t", "--no-history")
+        captured = capsys.readouterr()
+        assert exit_code == 0, prettify_error(captured.out)
+        assert not (history_dir / "pyallel").exists()
+
     @pytest.mark.parametrize("value", ["110", "-1", "0", "invalid", ""])
     def test_run_with_lines_modifier_invalid_value(self, capsys: pytest.CaptureFixture[str], value: str) -> None:
         exit_code = main.entry_point(f"lines={value} :::: echo hi", "--colour", "no")
@@ -288,6 +352,19 @@ class TestNonInteractiveMode:
             captured.out
         )
 
+    def test_run_with_encoding(self, capsys: pytest.CaptureFixture[str]) -> None:
+        exit_code = main.entry_point(r"printf 'caf\351\n'", "--encoding", "latin-1", *self.default_opts)
+        captured = capsys.readouterr()
+        assert exit_code == 0, prettify_error(captured.out)
+        compare_output(
+            actual=captured.out.splitlines(),
+            expected=[
+                r"[printf 'caf\351\n'] running...",
+                f"{PREFIX}café",
+                rf"[printf 'caf\351\n'] done {constants.TICK}",
+            ],
+        )
+
     def test_run_ok_command_with_summary(self, capsys: pytest.CaptureFixture[str]) -> None:
         exit_code = main.entry_point("echo hi", *self.default_opts[:-1])
         captured = capsys.readouterr()
@@ -372,3 +449,34 @@ class TestNonInteractiveMode:
                 f"[printf hi; sleep {wait}; echo bye] done {constants.TICK}",
             ],
         )
+
+
+class RecordingPrinter:
+    render_interval: float | None = None
+
+    def __init__(self) -> None:
+        self.renders = 0
+        self.data = ""
+
+    def print(self, output: ProcessGroupOutput, *, done: bool = False) -> None:  # noqa: ARG002
+        self.renders += 1
+        self.data += "".join(p.data for p in output.processes)
+
+
+def test_run_caps_renders_to_fps() -> None:
+    printer = RecordingPrinter()
+    process_group_manager = ProcessGroupManager.from_args("for i in $(seq 50); do echo $i; sleep 0.01; done")
+    exit_code = main.run(process_group_manager, printer, fps=5)
+    assert exit_code == 0
+    assert printer.data.splitlines() == [str(i) for i in range(1, 51)]
+    # The command takes at least half a second, so we should get around 3 frames plus the final render
+    assert printer.renders <= 6
+
+
+def test_run_without_fps_cap() -> None:
+    printer = RecordingPrinter()
+    process_group_manager = ProcessGroupManager.from_args("for i in $(seq 5); do echo $i; sleep 0.05; done")
+    exit_code = main.run(process_group_manager, printer, fps=0)
+    assert exit_code == 0
+    assert printer.data.splitlines() == [str(i) for i in range(1, 6)]
+    assert printer.renders >= 6
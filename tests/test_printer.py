@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from unittest.mock import patch
+
 import pytest
 
 from pyallel import constants
@@ -46,6 +48,20 @@ class TestInteractiveConsolePrinter:
             (True, "second", "\n"),
         ]
 
+    def test_generate_process_output_with_dropped_lines(self) -> None:
+        printer = InteractiveConsolePrinter(colours=Colours.from_colour("no"))
+
+        output = printer.generate_process_output(
+            ProcessOutput(id=1, command="seq 3", poll=0, data="1\n2\n3\n", scrollback=2),
+        )
+
+        assert output == [
+            (False, "[seq 3] done ✔", "\n"),
+            (True, "... 1 earlier lines not kept (see --scrollback)", "\n"),
+            (True, "2", "\n"),
+            (True, "3", "\n"),
+        ]
+
     def test_generate_process_output_status(self) -> None:
         printer = InteractiveConsolePrinter(colours=Colours.from_colour("no"))
 
@@ -55,6 +71,39 @@ class TestInteractiveConsolePrinter:
 
         assert output == "[echo first; echo second] done ✔"
 
+    def test_generate_process_output_status_queued(self) -> None:
+        printer = InteractiveConsolePrinter(colours=Colours.from_colour("no"), timer=True)
+
+        output = printer.generate_process_output_status(
+            ProcessOutput(id=1, command="echo hi", poll=None, queued=1.0),
+        )
+
+        assert output == "[echo hi] queued "
+
+        output = printer.generate_process_output_status(
+            ProcessOutput(id=1, command="echo hi", poll=None, queued=1.0, queued_reason="load 9.00 > 4"),
+        )
+
+        assert output == "[echo hi] queued (load 9.00 > 4) "
+
+    def test_generate_process_output_status_cancelled(self) -> None:
+        printer = InteractiveConsolePrinter(colours=Colours.from_colour("no"))
+
+        output = printer.generate_process_output_status(
+            ProcessOutput(id=1, command="sleep 1", poll=-2, cancelled=True),
+        )
+
+        assert output == f"[sleep 1] cancelled {constants.X}"
+
+    def test_generate_process_output_status_with_retries(self) -> None:
+        printer = InteractiveConsolePrinter(colours=Colours.from_colour("no"))
+
+        output = printer.generate_process_output_status(
+            ProcessOutput(id=1, command="make test", poll=0, retries=2, attempts=[(1.0, 1)]),
+        )
+
+        assert output == f"[make test] done {constants.TICK} (attempt 2/3)"
+
     def test_printer_generate_process_output_status_handles_long_command(self) -> None:
         printer = InteractiveConsolePrinter(colours=Colours.from_colour("no"))
 
@@ -64,6 +113,21 @@ class TestInteractiveConsolePrinter:
 
         assert output == "[echo first; ech...] done ✔"
 
+    def test_print_after_resize_repaints_everything(self, capsys: pytest.CaptureFixture[str]) -> None:
+        printer = InteractiveConsolePrinter(colours=Colours.from_colour("no"))
+        output = ProcessGroupOutput(id=1, processes=[ProcessOutput(id=1, command="echo hi", data="hi\n")])
+        printer.print(output)
+        capsys.readouterr()
+
+        printer.print(ProcessGroupOutput(id=1, processes=[ProcessOutput(id=1, command="echo hi")]))
+        assert constants.CLEAR_SCREEN not in capsys.readouterr().out
+
+        printer.handle_resize()
+        printer.print(ProcessGroupOutput(id=1, processes=[ProcessOutput(id=1, command="echo hi")]))
+        out = capsys.readouterr().out
+        assert constants.CLEAR_SCREEN in out
+        assert "hi\n" in out
+
     def test_set_process_lines(self) -> None:
         output = ProcessGroupOutput(id=1, processes=[ProcessOutput(id=1, data="first\nsecond\n")])
         assert output.processes[0].allocated_lines == 0
@@ -99,6 +163,38 @@ class TestInteractiveConsolePrinter:
         for i in range(59):
             assert output.processes[i].allocated_lines == 1, f"process index {i}"
 
+    def test_set_process_lines_reuses_layout(self) -> None:
+        output = ProcessGroupOutput(
+            id=1,
+            processes=[
+                ProcessOutput(id=1, data="first\nsecond\n"),
+                ProcessOutput(id=2, data="first\n" * 20),
+            ],
+        )
+        printer = InteractiveConsolePrinter()
+
+        with patch.object(printer, "_allocate_process_lines", wraps=printer._allocate_process_lines) as allocate:
+            printer.set_process_lines(output, lines=10)
+            assert [p.allocated_lines for p in output.processes] == [3, 7]
+
+            # More output for a process that already fills the screen doesn't change the layout
+            output.processes[1].append("more\n" * 20)
+            output.processes[1].allocated_lines = 0
+            printer.set_process_lines(output, lines=10)
+            assert [p.allocated_lines for p in output.processes] == [3, 7]
+            assert allocate.call_count == 1
+
+            # But it does if the process didn't fill its share of the screen
+            output.processes[0].append("third\nfourth\n")
+            printer.set_process_lines(output, lines=10)
+            assert [p.allocated_lines for p in output.processes] == [5, 5]
+            assert allocate.call_count == 2
+
+            # As does the screen size changing
+            printer.set_process_lines(output, lines=20)
+            assert [p.allocated_lines for p in output.processes] == [5, 15]
+            assert allocate.call_count == 3
+
     @pytest.mark.parametrize(
         ("lines", "lines1", "lines2", "lines3", "expected_lines1", "expected_lines2", "expected_lines3"),
         [
@@ -159,6 +255,15 @@ class TestNonInteractiveConsolePrinter:
 
         assert output == "[echo first; echo second] done ✔"
 
+    def test_generate_process_retry(self) -> None:
+        printer = NonInteractiveConsolePrinter(colours=Colours.from_colour("no"), timer=True)
+
+        output = printer.generate_process_retry(
+            ProcessOutput(id=1, command="make test", poll=None, retries=2, attempts=[(1.0, 1)]),
+        )
+
+        assert output == "[make test] failed with exit code 1, retrying... (attempt 1/3) (1.0s)"
+
     def test_generate_process_output(self) -> None:
         printer = NonInteractiveConsolePrinter(colours=Colours.from_colour("no"))
 
@@ -191,6 +296,121 @@ def test_generate_summary_ok_command() -> None:
     ]
 
 
+def test_generate_summary_queued_command() -> None:
+    summary = generate_summary(
+        process_group_outputs=[
+            ProcessGroupOutput(
+                id=1,
+                processes=[
+                    ProcessOutput(id=1, command="echo hi", poll=0, queued=1.0, start=1.0, end=2.0),
+                    ProcessOutput(id=2, command="echo bye", poll=0, queued=1.0, start=2.0, end=3.5),
+                ],
+            )
+        ],
+        colours=Colours.from_colour("no"),
+        include_timer=True,
+    )
+
+    assert summary == [
+        "Results Summary",
+        "====================================",
+        f"done {constants.TICK} 1.0s               [echo hi]",
+        f"done {constants.TICK} 1.5s (queued 1.0s) [echo bye]",
+    ]
+
+
+def test_generate_summary_expected_duration() -> None:
+    summary = generate_summary(
+        process_group_outputs=[
+            ProcessGroupOutput(
+                id=1,
+                processes=[
+                    ProcessOutput(id=1, command="echo hi", poll=0, start=1.0, end=2.0, expected=0.5),
+                    ProcessOutput(id=2, command="echo bye", poll=0, start=1.0, end=2.5),
+                ],
+            )
+        ],
+        colours=Colours.from_colour("no"),
+        include_timer=True,
+    )
+
+    assert summary == [
+        "Results Summary",
+        "======================================",
+        f"done {constants.TICK} 1.0s (expected 0.5s) [echo hi]",
+        f"done {constants.TICK} 1.5s                 [echo bye]",
+    ]
+
+
+def test_generate_summary_cancelled_command() -> None:
+    summary = generate_summary(
+        process_group_outputs=[
+            ProcessGroupOutput(
+                id=1,
+                processes=[
+                    ProcessOutput(id=1, command="echo hi", poll=1),
+                    ProcessOutput(id=2, command="sleep 1", poll=-2, cancelled=True),
+                    ProcessOutput(id=3, command="echo bye", poll=-1, cancelled=True),
+                ],
+            )
+        ],
+        colours=Colours.from_colour("no"),
+        include_timer=True,
+    )
+
+    assert summary == [
+        "Results Summary",
+        "===========================",
+        f"failed {constants.X}    0.0s [echo hi]",
+        f"cancelled {constants.X} 0.0s [sleep 1]",
+        f"cancelled {constants.X}      [echo bye]",
+    ]
+
+
+def test_generate_summary_timed_out_command() -> None:
+    summary = generate_summary(
+        process_group_outputs=[
+            ProcessGroupOutput(
+                id=1,
+                processes=[
+                    ProcessOutput(id=1, command="sleep 10", poll=-2, start=1.0, end=3.0, timed_out=True),
+                    ProcessOutput(id=2, command="echo hi", poll=0, start=1.0, end=1.0),
+                ],
+            )
+        ],
+        colours=Colours.from_colour("no"),
+        include_timer=True,
+    )
+
+    assert summary == [
+        "Results Summary",
+        "===========================",
+        f"timed out {constants.X} 2.0s [sleep 10]",
+        f"done {constants.TICK}      0.0s [echo hi]",
+    ]
+
+
+def test_generate_summary_retried_command() -> None:
+    summary = generate_summary(
+        process_group_outputs=[
+            ProcessGroupOutput(
+                id=1,
+                processes=[
+                    ProcessOutput(id=1, command="make test", poll=0, retries=2, attempts=[(1.0, 1), (2.5, -2)]),
+                ],
+            )
+        ],
+        colours=Colours.from_colour("no"),
+        include_timer=True,
+    )
+
+    assert summary == [
+        "Results Summary",
+        "=" * 68,
+        f"done {constants.TICK} 0.0s [make test] (failed attempts: 1.0s exit 1, 2.5s exit -2)",
+    ]
+
+
 def test_generate_summary_failed_command() -> None:
     summary = generate_summary(
         process_group_outputs=[
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import os
 import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from pyallel import process
-from pyallel.errors import InvalidLinesModifierError
-from pyallel.process import Process
+from pyallel.errors import (
+    InvalidDependencyModifierError,
+    InvalidFailFastModifierError,
+    InvalidJobsModifierError,
+    InvalidLinesModifierError,
+    InvalidRetriesModifierError,
+    InvalidTimeoutModifierError,
+)
+from pyallel.process import Process, ProcessOutput
 
 
 def test_from_command() -> None:
@@ -60,6 +68,102 @@ def test_from_command_with_lines_modifier_handles_multiple_separators() -> None:
     assert process.percentage_lines == 0.5
 
 
+def test_from_command_with_jobs_modifier() -> None:
+    process = Process.from_command(1, "lines=50 jobs=2 :::: sleep 0.1")
+    assert process.command == "sleep 0.1"
+    assert process.percentage_lines == 0.5
+    assert process.jobs == 2
+
+
+@pytest.mark.parametrize("value", ["invalid", "0", "-1", ""])
+def test_from_command_with_invalid_jobs_modifier(value: str) -> None:
+    with pytest.raises(
+        InvalidJobsModifierError,
+        match="jobs modifier must be a number greater than 0",
+    ):
+        Process.from_command(1, f"jobs={value} :::: sleep 0.1")
+
+
+def test_from_command_with_dependency_modifiers() -> None:
+    process = Process.from_command(1, "name=test after=build,lint :::: make test")
+    assert process.command == "make test"
+    assert process.name == "test"
+    assert process.after == ("build", "lint")
+
+
+@pytest.mark.parametrize(
+    ("value", "message"),
+    [
+        ("name=", "name modifier must not be empty"),
+        ("after=", "after modifier must be a comma separated list of names"),
+        ("after=,", "after modifier must be a comma separated list of names"),
+    ],
+)
+def test_from_command_with_invalid_dependency_modifiers(value: str, message: str) -> None:
+    with pytest.raises(InvalidDependencyModifierError, match=message):
+        Process.from_command(1, f"{value} :::: sleep 0.1")
+
+
+@pytest.mark.parametrize(("value", "expected"), [("yes", True), ("no", False)])
+def test_from_command_with_fail_fast_modifier(value: str, expected: bool) -> None:
+    process = Process.from_command(1, f"fail_fast={value} :::: sleep 0.1")
+    assert process.fail_fast is expected
+
+
+@pytest.mark.parametrize("value", ["true", ""])
+def test_from_command_with_invalid_fail_fast_modifier(value: str) -> None:
+    with pytest.raises(InvalidFailFastModifierError, match="fail_fast modifier must be either yes or no"):
+        Process.from_command(1, f"fail_fast={value} :::: sleep 0.1")
+
+
+@pytest.mark.parametrize(("value", "expected"), [("1", 1.0), ("0.5", 0.5), ("90", 90.0)])
+def test_from_command_with_timeout_modifier(value: str, expected: float) -> None:
+    process = Process.from_command(1, f"timeout={value} :::: sleep 0.1")
+    assert process.timeout == expected
+
+
+@pytest.mark.parametrize("value", ["invalid", "0", "-1", "inf", "nan", ""])
+def test_from_command_with_invalid_timeout_modifier(value: str) -> None:
+    with pytest.raises(
+        InvalidTimeoutModifierError, match="timeout modifier must be a number of seconds greater than 0"
+    ):
+        Process.from_command(1, f"timeout={value} :::: sleep 0.1")
+
+
+def test_from_command_with_retries_modifier() -> None:
+    process = Process.from_command(1, "retries=3 :::: sleep 0.1")
+    assert process.retries == 3
+
+
+@pytest.mark.parametrize("value", ["invalid", "0", "-1", ""])
+def test_from_command_with_invalid_retries_modifier(value: str) -> None:
+    with pytest.raises(InvalidRetriesModifierError, match="retries modifier must be a number greater than 0"):
+        Process.from_command(1, f"retries={value} :::: sleep 0.1")
+
+
+def test_retry() -> None:
+    process = Process(id=1, command="echo hi; exit 3", retries=1)
+    process.run()
+    assert process.wait() == 3
+    assert process.poll() == 3
+    process.retry(10)
+    assert process.attempts == [(process.attempts[0][0], 3)]
+    assert process.poll() is None
+    assert process.retry_at >= process.queued + 10
+    assert process.read() == b"hi\n"
+
+    process.run()
+    assert process.wait() == 3
+    assert process.read() == b"hi\n"
+
+
+def test_poll_queued() -> None:
+    process = Process(id=1, command="sleep 0.1")
+    assert process.poll() == -1
+    process.queued = 1.0
+    assert process.poll() is None
+
+
 @patch.object(process, "_is_buffered_reader", return_value=False)
 @patch.object(subprocess, "Popen")
 def test_run_not_buffered_reader(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
@@ -75,9 +179,135 @@ def test_run_not_buffered_reader(popen_mock: MagicMock, is_buffered_reader_mock:
 @patch.object(process, "_is_buffered_reader", return_value=True)
 @patch.object(subprocess, "Popen")
 def test_read(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
-    popen_mock.return_value.stdout.read1.side_effect = [b"first\nsecond\n", b""]
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"first\nsecond\n")
+    os.close(write_fd)
+    popen_mock.return_value.stdout.fileno.return_value = read_fd
     process = Process(1, "echo first; echo second")
     process.run()
     output = process.read()
     assert output == b"first\nsecond\n"
+    popen_mock.return_value.stdout.close.assert_called_once()
+    is_buffered_reader_mock.assert_called_once()
+
+
+@patch.object(process, "_is_buffered_reader", return_value=True)
+@patch.object(subprocess, "Popen")
+def test_read_no_output_yet(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
+    read_fd, write_fd = os.pipe()
+    popen_mock.return_value.stdout.fileno.return_value = read_fd
+    process = Process(1, "sleep 1; echo hi")
+    process.run()
+    assert process.read() == b""
+    os.write(write_fd, b"hi\n")
+    assert process.read() == b"hi\n"
+    popen_mock.return_value.stdout.close.assert_not_called()
+    os.close(write_fd)
+    is_buffered_reader_mock.assert_called_once()
+
+
+@patch.object(process, "_is_buffered_reader", return_value=True)
+@patch.object(subprocess, "Popen")
+def test_read_multiple_chunks(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
+    read_fd, write_fd = os.pipe()
+    popen_mock.return_value.stdout.fileno.return_value = read_fd
+    process = Process(1, "echo first; echo second")
+    process.run()
+    os.write(write_fd, b"first\n")
+    process._read_stdout()
+    os.write(write_fd, b"second\n")
+    process._read_stdout()
+    os.close(write_fd)
+    assert process.read() == b"first\nsecond\n"
+    assert process.read() == b""
+    is_buffered_reader_mock.assert_called_once()
+
+
+def test_output_append() -> None:
+    output = ProcessOutput(id=1, data="first\nsec")
+    assert output.lines == 3
+    output.append("ond\r")
+    output.append("\nthird")
+    assert output.data == "first\nsecond\r\nthird"
+    assert output.lines == 4
+    assert output.dropped_lines == 0
+
+
+def test_output_scrollback() -> None:
+    output = ProcessOutput(id=1, data="first\nsecond\n", scrollback=2)
+    output.merge(ProcessOutput(id=1, data="third\nfourth"))
+    assert output.data == "second\nthird\nfourth"
+    assert output.lines == 4
+    assert output.dropped_lines == 1
+
+
+def test_output_set_scrollback() -> None:
+    output = ProcessOutput(id=1, data="first\nsecond\nthird\n")
+    output.set_scrollback(1)
+    assert output.data == "third\n"
+    assert output.dropped_lines == 2
+    output.append("fourth\n")
+    assert output.data == "fourth\n"
+    assert output.dropped_lines == 3
+
+
+@pytest.mark.parametrize(
+    "data", ["", "first", "first\n", "first\nsecond\r\nthird", "first\n\nthird\n", "first\rsecond\x0cthird\r"]
+)
+def test_output_splitlines(data: str) -> None:
+    output = ProcessOutput(id=1, data=data)
+    assert output.splitlines() == data.splitlines()
+    for num_lines in range(5):
+        assert output.tail(num_lines) == (data.splitlines()[-num_lines:] if num_lines else [])
+
+
+def test_output_merge_partial_line() -> None:
+    output = ProcessOutput(id=1, data="first\nsec")
+    output.merge(ProcessOutput(id=1, data="ond\nthird"))
+    output.merge(ProcessOutput(id=1, data="\nfourth\n"))
+    assert output.splitlines() == ["first", "second", "third", "fourth"]
+    assert output.lines == 5
+
+
+@patch.object(process, "_is_buffered_reader", return_value=True)
+@patch.object(subprocess, "Popen")
+def test_read_text_character_split_across_reads(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
+    read_fd, write_fd = os.pipe()
+    popen_mock.return_value.stdout.fileno.return_value = read_fd
+    process = Process(1, "echo ✔")
+    process.run()
+    data = "✔\n".encode()
+    os.write(write_fd, data[:1])
+    assert process.read_text() == ""
+    os.write(write_fd, data[1:])
+    assert process.read_text() == "✔\n"
+    os.write(write_fd, b"done\n")
+    assert process.read_text() == "done\n"
+    os.close(write_fd)
+    is_buffered_reader_mock.assert_called_once()
+
+
+@patch.object(process, "_is_buffered_reader", return_value=True)
+@patch.object(subprocess, "Popen")
+def test_read_text_flushes_incomplete_character(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
+    read_fd, write_fd = os.pipe()
+    popen_mock.return_value.stdout.fileno.return_value = read_fd
+    process = Process(1, "printf '\\342'")
+    process.run()
+    os.write(write_fd, "✔".encode()[:1])
+    os.close(write_fd)
+    assert process.read_text() == "\ufffd"
+    is_buffered_reader_mock.assert_called_once()
+
+
+@patch.object(process, "_is_buffered_reader", return_value=True)
+@patch.object(subprocess, "Popen")
+def test_read_text_with_encoding(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
+    read_fd, write_fd = os.pipe()
+    popen_mock.return_value.stdout.fileno.return_value = read_fd
+    process = Process(1, "echo hi", encoding="utf-16-le")
+    process.run()
+    os.write(write_fd, "hi\n".encode("utf-16-le"))
+    os.close(write_fd)
+    assert process.read_text() == "hi\n"
     is_buffered_reader_mock.assert_called_once()
@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import os
+import signal
 import subprocess
+import time
+from typing import TYPE_CHECKING
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from pyallel import process
-from pyallel.errors import InvalidLinesModifierError
+from pyallel import constants, process
+from pyallel.errors import (
+    InvalidDependencyModifierError,
+    InvalidFailFastModifierError,
+    InvalidJobsModifierError,
+    InvalidLinesModifierError,
+)
 from pyallel.process import Process, ProcessOutput
 from pyallel.process_group import ProcessGroup, ProcessGroupOutput
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 
 def test_from_commands() -> None:
     expected_process_group = ProcessGroup(
@@ -67,6 +78,308 @@ def test_from_commands_with_lines_modifier_exceeds_100() -> None:
         )
 
 
+def test_from_commands_with_jobs() -> None:
+    process_group = ProcessGroup.from_commands(1, 1, "sleep 0.1", "::", "sleep 0.2", jobs=4)
+    assert process_group.jobs == 4
+
+
+def test_from_commands_with_jobs_modifier_overrides_jobs() -> None:
+    process_group = ProcessGroup.from_commands(1, 1, "jobs=1 :::: sleep 0.1", "::", "sleep 0.2", jobs=4)
+    assert process_group.jobs == 1
+
+
+def test_from_commands_with_conflicting_jobs_modifiers() -> None:
+    with pytest.raises(
+        InvalidJobsModifierError,
+        match="jobs modifier must be set to the same value for all processes within each process group",
+    ):
+        ProcessGroup.from_commands(1, 1, "jobs=1 :::: sleep 0.1", "::", "jobs=2 :::: sleep 0.2")
+
+
+@pytest.mark.parametrize(
+    ("commands", "message"),
+    [
+        (
+            ("name=a :::: true", "::", "name=a :::: true"),
+            "name modifier must be unique within each process group, 'a' is used more than once",
+        ),
+        (
+            ("after=a :::: true",),
+            "after modifier must refer to the name of a command in the same process group, got 'a'",
+        ),
+        (
+            ("name=a after=b :::: true", "::", "name=b after=a :::: true"),
+            "after modifiers must not form a cycle, check: a, b",
+        ),
+        (
+            ("name=a after=a :::: true",),
+            "after modifiers must not form a cycle, check: a",
+        ),
+    ],
+)
+def test_from_commands_with_invalid_dependencies(commands: tuple[str, ...], message: str) -> None:
+    with pytest.raises(InvalidDependencyModifierError, match=message):
+        ProcessGroup.from_commands(1, 1, *commands)
+
+
+def test_run_with_dependencies() -> None:
+    process_group = ProcessGroup.from_commands(
+        1,
+        1,
+        "after=build :::: sleep 0.1",
+        "::",
+        "name=build :::: sleep 0.1",
+        "::",
+        "sleep 0.1",
+    )
+    process_group.run()
+    assert [bool(p.start) for p in process_group.processes] == [False, True, True]
+    assert process_group.processes[0].poll() is None
+
+    process_group.processes[1].wait()
+    assert process_group.poll() is None
+    assert process_group.processes[0].start
+    assert process_group.processes[0].poll() is None
+
+    for p in process_group.processes:
+        p.wait()
+    assert process_group.poll() == 0
+
+
+def test_run_with_failed_dependency() -> None:
+    process_group = ProcessGroup.from_commands(
+        1,
+        1,
+        "name=build :::: false",
+        "::",
+        "name=test after=build :::: true",
+        "::",
+        "after=test :::: true",
+    )
+    process_group.run()
+    process_group.processes[0].wait()
+    assert process_group.poll() == 1
+    assert [p.poll() for p in process_group.processes] == [1, -1, -1]
+
+
+def test_run_with_jobs() -> None:
+    process_group = ProcessGroup(
+        id=1,
+        processes=[
+            Process(id=1, command="sleep 0.2"),
+            Process(id=2, command="sleep 0.2"),
+            Process(id=3, command="sleep 0.1"),
+        ],
+        jobs=2,
+    )
+    process_group.run()
+    assert [bool(p.start) for p in process_group.processes] == [True, True, False]
+    assert process_group.poll() is None
+
+    for p in process_group.processes[:2]:
+        p.wait()
+    assert process_group.poll() is None
+    assert process_group.processes[2].start
+
+    process_group.processes[2].wait()
+    assert process_group.poll() == 0
+    assert all(p.queued <= p.start for p in process_group.processes)
+
+
+def test_run_with_load_limits() -> None:
+    load_limits = MagicMock()
+    load_limits.check.return_value = "load 9.00 > 4"
+    process_group = ProcessGroup(
+        id=1,
+        processes=[Process(id=1, command="sleep 0.1"), Process(id=2, command="sleep 0.1")],
+        load_limits=load_limits,
+    )
+    process_group.run()
+    # The first process is always started so we can't end up waiting forever
+    assert [bool(p.start) for p in process_group.processes] == [True, False]
+    assert process_group.throttled
+    assert process_group.stream().processes[1].queued_reason == "load 9.00 > 4"
+
+    load_limits.check.return_value = ""
+    assert process_group.poll() is None
+    assert process_group.processes[1].start
+    assert not process_group.throttled
+
+    for p in process_group.processes:
+        p.wait()
+    assert process_group.poll() == 0
+
+
+def test_run_starts_critical_path_first() -> None:
+    processes = [
+        Process(id=1, command="sleep 0.1"),
+        Process(id=2, command="sleep 0.1", name="build"),
+        Process(id=3, command="sleep 0.1", after=["build"]),
+        Process(id=4, command="sleep 0.1"),
+    ]
+    processes[0].expected = 1.0
+    processes[1].expected = 0.5
+    processes[2].expected = 2.0
+    process_group = ProcessGroup(id=1, processes=processes, jobs=2)
+    process_group.run()
+    # build and the process that depends on it are expected to take the longest, followed by the first process
+    assert [bool(p.start) for p in process_group.processes] == [True, True, False, False]
+
+    for p in process_group.processes[:2]:
+        p.wait()
+    process_group.poll()
+    assert [bool(p.start) for p in process_group.processes] == [True, True, True, True]
+
+    for p in process_group.processes:
+        p.wait()
+    assert process_group.poll() == 0
+
+
+def test_from_commands_with_fail_fast_modifier_overrides_fail_fast() -> None:
+    process_group = ProcessGroup.from_commands(1, 1, "fail_fast=no :::: sleep 0.1", "::", "sleep 0.2", fail_fast=True)
+    assert not process_group.fail_fast
+
+
+def test_from_commands_with_conflicting_fail_fast_modifiers() -> None:
+    with pytest.raises(
+        InvalidFailFastModifierError,
+        match="fail_fast modifier must be set to the same value for all processes within each process group",
+    ):
+        ProcessGroup.from_commands(1, 1, "fail_fast=yes :::: sleep 0.1", "::", "fail_fast=no :::: sleep 0.2")
+
+
+def test_poll_with_fail_fast() -> None:
+    process_group = ProcessGroup(
+        id=1,
+        processes=[
+            Process(id=1, command="false"),
+            Process(id=2, command="exec sleep 5"),
+            Process(id=3, command="true"),
+        ],
+        jobs=2,
+        fail_fast=True,
+    )
+    process_group.run()
+    process_group.processes[0].wait()
+    assert process_group.poll() is None
+    assert process_group.deadline is not None
+
+    process_group.processes[1].wait()
+    assert process_group.poll() == 1
+    assert [p.cancelled for p in process_group.processes] == [False, True, True]
+    assert process_group.processes[2].poll() == -1
+    assert [p.cancelled for p in process_group.stream().processes] == [False, True, True]
+
+
+def test_poll_with_fail_fast_kills_processes_after_grace_period() -> None:
+    process_group = ProcessGroup(
+        id=1,
+        processes=[
+            Process(id=1, command="sleep 0.1; false"),
+            Process(id=2, command="trap '' INT; sleep 5"),
+        ],
+        fail_fast=True,
+        grace_period=0.0,
+    )
+    process_group.run()
+    process_group.processes[0].wait()
+    assert process_group.poll() is None
+    assert process_group.poll() is None
+    assert process_group.deadline is None
+    assert process_group.processes[1].wait() == -9
+
+
+def test_from_commands_with_timeout() -> None:
+    process_group = ProcessGroup.from_commands(1, 1, "timeout=5 :::: sleep 0.1", "::", "sleep 0.2", timeout=10)
+    assert [p.timeout for p in process_group.processes] == [5.0, 10.0]
+
+
+def test_poll_with_timeout() -> None:
+    process_group = ProcessGroup(
+        id=1,
+        processes=[Process(id=1, command="exec sleep 5", timeout=0.1), Process(id=2, command="true")],
+    )
+    process_group.run()
+    deadline = process_group.deadline
+    assert deadline is not None
+    assert deadline == process_group.processes[0].start + 0.1
+
+    time.sleep(0.1)
+    assert process_group.poll() is None
+    assert process_group.processes[0].timed_out
+    assert process_group.processes[0].wait() == -signal.SIGINT
+    assert process_group.poll() == 1
+    assert process_group.deadline is None
+    assert [p.timed_out for p in process_group.stream().processes] == [True, False]
+
+
+@pytest.mark.parametrize(("grace_period", "expected"), [(0.1, ["interrupt", "terminate", "kill"]), (0.0, ["kill"])])
+def test_poll_with_timeout_escalates(grace_period: float, expected: list[str]) -> None:
+    process_group = ProcessGroup(
+        id=1,
+        processes=[Process(id=1, command="sleep 5", timeout=0.1)],
+        grace_period=grace_period,
+    )
+    signals = MagicMock()
+    with patch.multiple(Process, interrupt=signals.interrupt, terminate=signals.terminate, kill=signals.kill):
+        process_group.run()
+        # Keep polling like the main loop would until there is nothing left to send
+        while (deadline := process_group.deadline) is not None:
+            time.sleep(max(deadline - time.perf_counter(), 0.0))
+            process_group.poll()
+
+    assert [name for name, _, _ in signals.mock_calls] == expected
+    process_group.processes[0].kill()
+    process_group.processes[0].wait()
+
+
+@patch.object(constants, "RETRY_BACKOFF", 0.1)
+def test_poll_with_retries(tmp_path: Path) -> None:
+    marker = tmp_path / "marker"
+    process_group = ProcessGroup(
+        id=1,
+        processes=[Process(id=1, command=f"test -f {marker} || {{ touch {marker}; exit 3; }}", retries=2)],
+    )
+    process_group.run()
+    process_group.processes[0].wait()
+    assert process_group.poll() is None
+    assert process_group.processes[0].attempts == [(process_group.processes[0].attempts[0][0], 3)]
+    assert process_group.processes[0].queued_reason == "waiting to retry"
+    deadline = process_group.deadline
+    assert deadline is not None
+
+    time.sleep(max(deadline - time.perf_counter(), 0.0))
+    assert process_group.poll() is None
+    assert process_group.processes[0].start
+    process_group.processes[0].wait()
+    assert process_group.poll() == 0
+    assert len(process_group.stream().processes[0].attempts) == 1
+
+
+@patch.object(constants, "RETRY_BACKOFF", 0.0)
+def test_poll_with_retries_exhausted() -> None:
+    process_group = ProcessGroup(id=1, processes=[Process(id=1, command="exit 3", retries=2)])
+    process_group.run()
+    while (poll := process_group.poll()) is None:
+        time.sleep(0.01)
+
+    assert poll == 1
+    assert [code for _, code in process_group.processes[0].attempts] == [3, 3]
+
+
+def test_handle_signal_cancels_queued_processes() -> None:
+    process_group = ProcessGroup(
+        id=1,
+        processes=[Process(id=1, command="sleep 5"), Process(id=2, command="true")],
+        jobs=1,
+    )
+    process_group.run()
+    process_group.handle_signal(2)
+    process_group.processes[0].wait()
+    assert process_group.poll() is not None
+    assert process_group.processes[1].poll() == -1
+
+
 @patch.object(process, "_is_buffered_reader", return_value=True)
 @patch.object(subprocess, "Popen")
 def test_stream(popen_mock: MagicMock, is_buffered_reader_mock: MagicMock) -> None:
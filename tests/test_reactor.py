@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+
+from pyallel.reactor import Reactor
+
+
+def test_wait_times_out() -> None:
+    reactor = Reactor()
+    start = time.perf_counter()
+    reactor.wait(0.05)
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_wake() -> None:
+    reactor = Reactor()
+    reactor.wake()
+    reactor.wake()
+    start = time.perf_counter()
+    reactor.wait(5)
+    assert time.perf_counter() - start < 1
+
+
+def test_watch_exit() -> None:
+    reactor = Reactor()
+    process = subprocess.Popen(["sleep", "0.1"])
+    reactor.watch_exit(process.pid)
+    start = time.perf_counter()
+    reactor.wait(5)
+    assert time.perf_counter() - start < 1
+    assert process.wait() == 0
+
+
+def test_watch_read() -> None:
+    reactor = Reactor()
+    read_fd, write_fd = os.pipe()
+    received: list[bytes] = []
+
+    def callback() -> None:
+        received.append(os.read(read_fd, 1024))
+        reactor.unwatch(read_fd)
+
+    reactor.watch_read(read_fd, callback)
+    os.write(write_fd, b"hi")
+    reactor.wait(5)
+    reactor.wait(0.01)
+    assert received == [b"hi"]
+    os.close(read_fd)
+    os.close(write_fd)